@@ -1,10 +1,11 @@
 import math
 import json
-import statistics
 from pprint import pprint
-from scipy.stats import t
 from datetime import datetime
 import os
+import threading
+import numpy as np
+from fan_curve import FanCurveSet
 
 DEFAULT_COEFFICIENTS = {
     "none": {
@@ -39,6 +40,208 @@ def load_fan_coefficients(file_path="fan_coefficients.json"):
     return coeffs
 
 
+class FanCoefficientRegistry:
+    """Parsed fan coefficients, re-read only when the file's mtime changes.
+
+    Each cover's forward/reverse calibration is prebuilt as a FanCurveSet so
+    duty → flow conversion is a lookup plus one vectorized evaluation.
+    """
+
+    def __init__(self, file_path="fan_coefficients.json"):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._coeffs = None
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.file_path)
+        except OSError:
+            mtime = None
+        with self._lock:
+            if self._coeffs is not None and mtime == self._mtime:
+                return
+            coeffs = load_fan_coefficients(self.file_path)
+            self.curves = {cover: FanCurveSet.from_config(values) for cover, values in coeffs.items()}
+            self._coeffs = coeffs
+            self._mtime = mtime
+
+    def coefficients(self):
+        # 공유 객체이므로 수정하지 말 것
+        self._refresh()
+        return self._coeffs
+
+    def get(self, cover):
+        coeffs = self.coefficients()
+        return coeffs.get(cover, coeffs.get("none", DEFAULT_COEFFICIENTS["none"]))
+
+    def curve(self, cover):
+        self._refresh()
+        return self.curves.get(cover) or self.curves.get("none") \
+            or FanCurveSet.from_config(DEFAULT_COEFFICIENTS["none"])
+
+    def duty_to_flow(self, duty, cover, fan_count=1):
+        """m³/h for a duty array; `cover`/`fan_count` may be per-row arrays for 2-D duty."""
+        if isinstance(cover, str):
+            return self.curve(cover).flow(duty, fan_count)
+        # 시험별 커버: 같은 커버 행끼리 묶어서 한 번에 변환
+        duty = np.asarray(duty, dtype=float)
+        cover = np.asarray(cover)
+        fan_count = np.asarray(fan_count)[:, None]
+        flow = np.empty_like(duty)
+        for name in np.unique(cover):
+            rows = cover == name
+            flow[rows] = self.curve(str(name)).flow(duty[rows], fan_count[rows])
+        return flow
+
+
+_registries = {}
+
+
+def fan_coefficient_registry(file_path="fan_coefficients.json"):
+    """Process-wide registry for `file_path`."""
+    if file_path not in _registries:
+        _registries[file_path] = FanCoefficientRegistry(file_path)
+    return _registries[file_path]
+
+
+def fit_power_law(pressures, flows):
+    """Vectorized log-log least-squares fit of V = C·ΔP^n along the last axis.
+
+    `pressures`, `flows` may be 1-D (one test) or 2-D (tests × points).
+    Rows shorter than the others can be padded with NaN.
+    """
+    # 𝑥_𝑖 = ln⁡(∆𝑃_𝑖), 𝑦_𝑖 = ln⁡(𝑉 ̇_𝑖) (연속 배열 한 번에 변환)
+    x = np.log(np.asarray(pressures, dtype=float))
+    y = np.log(np.asarray(flows, dtype=float))
+    # NaN 패딩 제외
+    mask = np.isfinite(x) & np.isfinite(y)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    # 𝑁
+    N = mask.sum(axis=-1)
+    # 평균
+    mean_x = x.sum(axis=-1) / N
+    mean_y = y.sum(axis=-1) / N
+    # 편차 (패딩 위치는 0)
+    dx = np.where(mask, x - mean_x[..., None], 0.0)
+    dy = np.where(mask, y - mean_y[..., None], 0.0)
+    # 분산, 공분산 (N-1)
+    sxx = (dx * dx).sum(axis=-1)
+    syy = (dy * dy).sum(axis=-1)
+    sxy = (dx * dy).sum(axis=-1)
+    variance_x = sxx / (N - 1)
+    variance_y = syy / (N - 1)
+    covariance = sxy / (N - 1)
+    # 𝑛, 𝐶 for 𝑦 = ln⁡(𝐶) + 𝑛𝑥
+    n = covariance / variance_x
+    C = np.exp(mean_y - mean_x * n)
+    # 표준 오차 𝑠_𝑛, 𝑠_ln⁡(𝐶)
+    mean_squared_x = (x * x).sum(axis=-1) / N
+    s_n = np.sqrt((variance_y - n * covariance) / (N - 2)) / np.sqrt(variance_x)
+    s_lnC = s_n * np.sqrt(mean_squared_x)
+    # 로그 공간 결정 계수
+    r2_ln = sxy * sxy / (sxx * syy)
+
+    return {
+        "N": N,
+        "x": x,
+        "y": y,
+        "mask": mask,
+        "mean x": mean_x,
+        "deviation of x": dx,
+        "average of deviation of x": dx.sum(axis=-1) / N,
+        "variance of x": variance_x,
+        "mean squared of x": mean_squared_x,
+        "mean y": mean_y,
+        "deviation of y": dy,
+        "average of deviation of y": dy.sum(axis=-1) / N,
+        "variance of y": variance_y,
+        "covariance": covariance,
+        "n": n,
+        "C": C,
+        "variance of n": s_n,
+        "variance of ln(C)": s_lnC,
+        "r^2 of ln": r2_ln,
+    }
+
+
+# Student t 분위수 t(1-α, dof), dof = 1 ~ 20
+# 표에 없는 (α, dof)만 scipy로 계산 후 저장
+_T_QUANTILES = {
+    0.025: [
+                12.706204736174694, 4.302652729749462, 3.1824463052837078, 2.7764451051977934,
+                2.5705818356363146, 2.4469118511449786, 2.364624251592784, 2.306004135204166,
+                2.262157162798205, 2.228138851986274, 2.200985160091639, 2.1788128296672284,
+                2.1603686564627913, 2.144786687917804, 2.131449545559776, 2.1199052992212546,
+                2.1098155778333156, 2.1009220402410382, 2.0930240544083087, 2.085963447265864,
+    ],
+    0.05: [
+                6.313751514675037, 2.9199855803537242, 2.3533634348018233, 2.1318467863266495,
+                2.0150483733330233, 1.9431802805153042, 1.8945786050900062, 1.8595480375308973,
+                1.833112932656237, 1.8124611228116756, 1.7958848187040433, 1.782287555649319,
+                1.7709333959868725, 1.761310135774891, 1.753050355692572, 1.7458836762762495,
+                1.7396067260750725, 1.7340636066175388, 1.7291328115213682, 1.7247182429207866,
+    ],
+}
+_t_cache = {(alpha, dof + 1): value
+            for alpha, values in _T_QUANTILES.items()
+            for dof, value in enumerate(values)}
+
+
+def t_quantile(alpha, dof):
+    """One-sided Student t quantile t(1-α, dof); `dof` may be an array."""
+    if np.ndim(dof):
+        dof = np.asarray(dof)
+        return np.array([t_quantile(alpha, int(d)) for d in dof.ravel()]).reshape(dof.shape)
+    key = (alpha, int(dof))
+    if key not in _t_cache:
+        # 라즈베리 파이 기동 시간 단축을 위해 scipy는 필요할 때만 불러옴
+        from scipy.stats import t
+        _t_cache[key] = float(t.ppf(1 - alpha, key[1]))
+    return _t_cache[key]
+
+
+# density(㎥/kg), 𝜌_𝑆𝑇𝑃 where STP: 23 degree celcius, 1atm
+DENSITY_AT_STP = 1.1919
+# viscousity(Pa·s), 𝜇_𝑆𝑇𝑃 (not sure)
+VISCOSITY_AT_STP = 0.00001827
+
+
+def air_properties(temperature, relative_humidity, atmospheric_pressure):
+    """Air density and viscosity from 𝑇(℃), ∅(%), 𝑃(Pa); scalars or arrays."""
+    T = 273.15 + np.asarray(temperature, dtype=float)
+    P = np.asarray(atmospheric_pressure, dtype=float)
+    H = np.asarray(relative_humidity, dtype=float) / 100
+    # Partial Pressure(Pa), 𝑃_𝑣𝑠=e^(59.484085−6790.4985/T−5.02802 ln⁡(𝑇))
+    partial_pressure = H * np.exp(59.484085 - (6790.4985 / T) - 5.02802 * np.log(T))
+    # density(㎥/kg), 𝜌_𝑎𝑖𝑟 = (𝑃_𝑏𝑎𝑟−0.37802∅𝑃_𝑣𝑠)/287.055𝑇
+    density = (P - 0.37802 * partial_pressure) / (287.055 * T)
+    # viscousity(Pa·s) of air, 𝜇_𝑎𝑖𝑟=(𝑏𝑇^0.5)/(1+𝑠/𝑇)
+    viscosity = (0.000001458 * np.sqrt(T)) / (1 + 110.4 / T)
+    return {
+        "T": T.tolist(),
+        "P": P.tolist(),
+        "H": H.tolist(),
+        "partial pressure": partial_pressure,
+        "density of air": density,
+        "viscousity of air": viscosity,
+    }
+
+
+def stp_correction(n, density, viscosity):
+    """𝐶_0/𝐶=(𝜇/𝜇_𝑆𝑇𝑃)^(2𝑛−1)×(𝜌/𝜌_𝑆𝑇𝑃)^(1−𝑛); scalars or arrays."""
+    n = np.asarray(n, dtype=float)
+    return np.power(np.asarray(viscosity) / VISCOSITY_AT_STP, 2 * n - 1) \
+         * np.power(np.asarray(density) / DENSITY_AT_STP, 1 - n)
+
+
+def leakage_area(C0, n, dp=50):
+    """Effective leakage area (㎡) at `dp` Pa; scalars or arrays."""
+    n = np.asarray(n, dtype=float)
+    return np.asarray(C0) * math.sqrt(DENSITY_AT_STP / 2) * np.power(dp, n - 0.5) / 3_600
+
+
 '''
 measured_data = {
                  "initial_zero_pressure": 0,        # (Pa)
@@ -48,13 +251,126 @@ measured_data = {
                  "atmospheric_pressure": float,     # (Pa)
                  "measured_value": [
                    [∆P_i: float,                    # (Pa)
-                    V ̇_i: float], ...               # (㎥/h)
+                    duty_i: float,                  # (%) → V ̇_i (㎥/h)
+                    s_∆P_i: float], ...             # (Pa) 평균 압력의 표준 오차, 선택
+                   ]
+                 }
+
+다중 팬 / 다중 압력 측정점 (rig.json 장비) 시험
+measured_data = {
+                 "fans": [{"name": str, "cover": str}, ...],   # 팬별 커버
+                 "measured_value": [
+                   [[∆P_i,1, ∆P_i,2, ...],          # (Pa) 측정점별 압력 → 평균
+                    [duty_i,1, duty_i,2, ...],      # (%) 팬별 duty → 풍량 합
+                    s_∆P_i], ...
                    ]
                  }
 '''
 
+
+def station_flows(measured_value, fan_curves, fan_count=1):
+    """(∆P, V ̇) arrays for measured_value rows.
+
+    Rows hold either a scalar ∆P and duty (`fan_count` identical fans on one
+    curve) or per-tap pressures and per-fan duties, one curve per fan in
+    `fan_curves`; per-fan flows are summed and tap pressures averaged.
+    """
+    if all(np.ndim(row[1]) == 0 and np.ndim(row[0]) == 0 for row in measured_value):
+        points = np.asarray([row[:2] for row in measured_value], dtype=float)
+        curve = fan_curves[0] if isinstance(fan_curves, (list, tuple)) else fan_curves
+        return points[:, 0], np.asarray(curve.flow(points[:, 1], fan_count), dtype=float)
+    pressures = np.array([np.mean(row[0]) for row in measured_value], dtype=float)
+    # (측정 수 × 팬 수) duty, 팬별 보정 곡선으로 변환 후 합산
+    duty = np.asarray([row[1] for row in measured_value], dtype=float)
+    if duty.ndim == 1:
+        duty = duty[:, None]
+    if not isinstance(fan_curves, (list, tuple)):
+        fan_curves = [fan_curves] * duty.shape[1]
+    if len(fan_curves) != duty.shape[1]:
+        raise ValueError(f"{duty.shape[1]} fan duties per station but {len(fan_curves)} fan curves")
+    flows = sum(np.asarray(curve.flow(duty[:, i]), dtype=float) for i, curve in enumerate(fan_curves))
+    return pressures, flows
+
+
+class OnlineFit:
+    """Running log-log least-squares fit of V = C·ΔP^n, updated in O(1) per station.
+
+    Keeps N, Σx, Σy, Σx², Σxy, Σy² of x = ln ΔP, y = ln V and gives the same n, C,
+    C0, Q50, ACH50 and 95% confidence ranges as BlowerDoorTestCalculator for the
+    stations added so far (air properties fixed at construction).
+    """
+
+    def __init__(self, interior_volume, fan_curves, fan_count=1, temperature=20,
+                 relative_humidity=50, atmospheric_pressure=101325, alpha=0.025):
+        self.interior_volume = float(interior_volume)
+        self.fan_curves = fan_curves
+        self.fan_count = fan_count
+        self.alpha = alpha
+        air = air_properties(temperature, relative_humidity, atmospheric_pressure)
+        self.density = float(air["density of air"])
+        self.viscosity = float(air["viscousity of air"])
+        self.N = 0
+        self.sum_x = self.sum_y = 0.0
+        self.sum_xx = self.sum_xy = self.sum_yy = 0.0
+
+    def add(self, row):
+        # measured_value 한 행 (단일 팬 또는 다중 팬 형식)
+        pressures, flows = station_flows([row], self.fan_curves, self.fan_count)
+        self.add_point(float(pressures[0]), float(flows[0]))
+
+    def add_point(self, pressure, flow):
+        if pressure <= 0 or flow <= 0:
+            return
+        x = math.log(pressure)
+        y = math.log(flow)
+        self.N += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_xy += x * y
+        self.sum_yy += y * y
+
+    def results(self, dp=50):
+        """Live fit, None below 2 stations; ranges need 3 stations."""
+        N = self.N
+        if N < 2:
+            return None
+        mean_x = self.sum_x / N
+        mean_y = self.sum_y / N
+        # 편차 제곱합 Σ(x-¯x)², Σ(x-¯x)(y-¯y), Σ(y-¯y)²
+        sxx = self.sum_xx - N * mean_x * mean_x
+        sxy = self.sum_xy - N * mean_x * mean_y
+        syy = self.sum_yy - N * mean_y * mean_y
+        if sxx <= 0:
+            return None
+        n = sxy / sxx
+        C = math.exp(mean_y - mean_x * n)
+        correction = float(stp_correction(n, self.density, self.viscosity))
+        C0 = C * correction
+        Q50 = C0 * math.pow(dp, n)
+        val = {"N": N, "n": n, "C": C, "C0": C0, "Q50": Q50, "ACH50": Q50 / self.interior_volume}
+        if N < 3:
+            return val
+        # 표준 오차 𝑠_𝑛, 𝑠_ln⁡(𝐶) (fit_power_law와 같은 식)
+        s_n = math.sqrt(max(syy - n * sxy, 0.0) / (N - 2) / sxx)
+        s_lnC = s_n * math.sqrt(self.sum_xx / N)
+        t = t_quantile(self.alpha, N - 2)
+        val["n range"] = [n - t * s_n, n + t * s_n]
+        val["C range"] = [C * math.exp(-t * s_lnC), C * math.exp(t * s_lnC)]
+        val["C0 range"] = [c * correction for c in val["C range"]]
+        # 보고서 Q50+- 와 같은 구간 (C0, n 범위 조합)
+        val["Q50 range"] = [c0 * math.pow(dp, m) for c0, m in zip(val["C0 range"], val["n range"])]
+        # 50Pa 회귀값의 95% 구간 (volumetric_flow_rate의 margin of error of y), 조기 종료 판정용
+        moey = t * s_n * math.sqrt(sxx / N + math.pow(math.log(dp) - mean_x, 2))
+        val["margin of error of y"] = moey
+        val["ACH50 range"] = [val["ACH50"] * math.exp(-moey), val["ACH50"] * math.exp(moey)]
+        # ACH50 구간의 상대 폭 (큰 쪽)
+        val["ACH50 margin"] = math.exp(moey) - 1
+        return val
+
+
 class BlowerDoorTestCalculator:
-    def __init__(self, measured_data):
+    def __init__(self, measured_data, registry=None):
         # 측정 값
         self.measured_data = measured_data
         # 측정 값 변수 저장
@@ -69,95 +385,94 @@ class BlowerDoorTestCalculator:
         self.cover = measured_data.get("fan_cover", "none").lower()
         self.num_fans = int(measured_data.get("fan_count", 2))
 
-        fan_coeffs = load_fan_coefficients()
-        coeff = fan_coeffs.get(self.cover, fan_coeffs.get("none", DEFAULT_COEFFICIENTS["none"]))
-        # for Forward flow
-        self.slope_fwd = coeff["forward"]["slope"]
-        self.intercept_fwd = coeff["forward"]["intercept"]
-        # for Reverse flow
-        self.slope_rev = coeff["reverse"]["slope"]
-        self.intercept_rev = coeff["reverse"]["intercept"]
+        if registry is None:
+            registry = fan_coefficient_registry()
+        # forward / reverse 보정 곡선 (fan_curve.FanCurveSet)
+        self.fan_curve = registry.curve(self.cover)
+        # 다중 팬 장비: 팬별 보정 곡선 (커버 미지정 팬은 시험 커버)
+        self.fans = measured_data.get("fans")
+        if self.fans:
+            self.fan_curves = [registry.curve(fan.get("cover", self.cover).lower()) for fan in self.fans]
+            self.num_fans = len(self.fans)
+        else:
+            self.fan_curves = self.fan_curve
         # 풍량 측정 값 저장
-        self.measured_values = [[i, (self.slope_fwd * j + self.intercept_fwd) * self.num_fans]
-                                if j < 50 else
-                                [i, (self.slope_rev * j + self.intercept_rev) * self.num_fans]
-                                for i, j in measured_data["measured_value"]]
+        pressures, flows = station_flows(measured_data["measured_value"], self.fan_curves, self.num_fans)
+        self.measured_values = [[float(i), float(j)] for i, j in zip(pressures, flows)]
 
 
     @classmethod
-    def from_file(cls, file_path, conditions="conditions.json"):
+    def from_file(cls, file_path, conditions="conditions.json", registry=None):
         # 측정 값 저장된 file 활용 시
         with open(file_path, 'r') as file:
             data = json.load(file)
         with open(conditions, 'r') as file:
             data.update(json.load(file))
-        return cls(data)
+        return cls(data, registry)
         
     # 중간 값 계산
     def calculate_interim_values(self):
         self.val["measured values"] = self.measured_values
-        # 𝑁
-        self.val["N"] = len(self.measured_values)
         # 95% confidence, α = 0.025
         self.val["alpha"] = 0.025
-        
+
+        # [∆P_i, V ̇_i] 연속 배열로 한 번에 회귀
+        points = np.ascontiguousarray(self.measured_values, dtype=float)
+        fit = fit_power_law(points[:, 0], points[:, 1])
+
+        # 𝑁
+        self.val["N"] = int(fit["N"])
         # 𝑥_𝑖 = ln⁡(∆𝑃_𝑖)
-        self.val["x"] = [math.log(i) for i, _ in self.measured_values]
-        self.val["mean x"] = statistics.mean(self.val["x"])
-        self.val["average of x"] = statistics.mean(self.val["x"])
-        self.val["deviation of x"] = [x - self.val["average of x"] for x in self.val["x"]]
-        self.val["average of deviation of x"] = statistics.mean(self.val["deviation of x"])
-        self.val["variance of x"] = statistics.variance(self.val["x"])
-        self.val["mean squared of x"] = statistics.mean([i**2 for i in self.val["x"]])
-        
-        # 𝑦_𝑖 = ln⁡(𝑉 ̇_𝑖)
-        self.val["y"] = [math.log(j) for _, j in self.measured_values]
-        self.val["mean y"] = statistics.mean(self.val["y"])
-        self.val["average of y"] = statistics.mean(self.val["y"])
-        self.val["deviation of y"] = [x - self.val["average of y"] for x in self.val["y"]]
-        self.val["average of deviation of y"] = statistics.mean(self.val["deviation of y"])
-        self.val["variance of y"] = statistics.variance(self.val["y"])
-        
+        self.val["x"] = fit["x"].tolist()
+        self.val["mean x"] = float(fit["mean x"])
+        self.val["average of x"] = self.val["mean x"]
+        self.val["deviation of x"] = fit["deviation of x"].tolist()
+        self.val["average of deviation of x"] = float(fit["average of deviation of x"])
+        self.val["variance of x"] = float(fit["variance of x"])
+        self.val["mean squared of x"] = float(fit["mean squared of x"])
+
+        # 𝑦_𝑖 = ln⁡(𝑉 ̇_𝑖)
+        self.val["y"] = fit["y"].tolist()
+        self.val["mean y"] = float(fit["mean y"])
+        self.val["average of y"] = self.val["mean y"]
+        self.val["deviation of y"] = fit["deviation of y"].tolist()
+        self.val["average of deviation of y"] = float(fit["average of deviation of y"])
+        self.val["variance of y"] = float(fit["variance of y"])
+
         # covariance (𝑥_𝑖−¯𝑥)(𝑦_𝑖−¯𝑦)/(𝑁-1)
-        self.val["covariance"] = sum([i * j for (i, j) in zip(self.val["deviation of x"], 
-                                                              self.val["deviation of y"])]) / (self.val["N"] - 1)
-        
-        # 𝑛 for 𝑦 = ln⁡(𝐶) + 𝑛𝑥
-        self.val["n"] = self.val["covariance"] / self.val["variance of x"]
-        # 𝐶 for 𝑦 = ln⁡(𝐶) + 𝑛𝑥
-        self.val["C"] = math.exp(self.val["mean y"] - self.val["mean x"] * self.val["n"])
+        self.val["covariance"] = float(fit["covariance"])
+
+        # 𝑛, 𝐶 for 𝑦 = ln⁡(𝐶) + 𝑛𝑥
+        self.val["n"] = float(fit["n"])
+        self.val["C"] = float(fit["C"])
+
+        # 표준 오차 𝑠_𝑛, 𝑠_ln⁡(𝐶), 로그 공간 결정 계수
+        self.val["variance of n"] = float(fit["variance of n"])
+        self.val["variance of ln(C)"] = float(fit["variance of ln(C)"])
+        self.val["r^2 of ln"] = float(fit["r^2 of ln"])
     
     # calibration for 𝜇, 𝜌 using 𝑇, ∅, 𝑃
     def calculate_calibration_values(self):
-        self.val["T"] = 273.15 + self.temperature
-        self.val["P"] = self.atmospheric_pressure
-        self.val["H"] = self.relative_humidity/100
-
-        # density(㎥/kg), 𝜌_𝑆𝑇𝑃 where STP: 23 degree celcius, 1atm
-        self.val["density at STP"] = 1.1919
-        # Partial Pressure(Pa), 𝑃_𝑣𝑠=e^(59.484085−6790.4985/T−5.02802 ln⁡(𝑇))
-        self.val["partial pressure"] = self.val["H"] * math.exp(59.484085 - (6790.4985 / self.val["T"])\
-                                                                - 5.02802 * math.log(self.val["T"]))
-        # density(㎥/kg), 𝜌_𝑎𝑖𝑟 = (𝑃_𝑏𝑎𝑟−0.37802∅𝑃_𝑣𝑠)/287.055𝑇 
-        self.val["density of air"] = (self.val["P"] - 0.37802 * self.val["partial pressure"]) / (287.055 * self.val["T"])
-        # viscousity(Pa·s), 𝜇_𝑆𝑇𝑃 (not sure)
-        self.val["viscousity at STP"] = 0.00001827
-        # viscousity(Pa·s) of air, 𝜇_𝑎𝑖𝑟=(𝑏𝑇^0.5)/(1+𝑠/𝑇)
-        self.val["viscousity of air"] = (0.000001458 * math.sqrt(self.val["T"]) ) / (1 + 110.4/self.val["T"])
+        air = air_properties(self.temperature, self.relative_humidity, self.atmospheric_pressure)
+        self.val["T"] = air["T"]
+        self.val["P"] = air["P"]
+        self.val["H"] = air["H"]
+
+        self.val["density at STP"] = DENSITY_AT_STP
+        self.val["partial pressure"] = float(air["partial pressure"])
+        self.val["density of air"] = float(air["density of air"])
+        self.val["viscousity at STP"] = VISCOSITY_AT_STP
+        self.val["viscousity of air"] = float(air["viscousity of air"])
         
         # 𝐶_0 from 𝐶_0/𝐶=(𝜇/𝜇_𝑆𝑇𝑃)^(2𝑛−1)×(𝜌/𝜌_𝑆𝑇𝑃)^(1−𝑛)
-        self.val["C0"] = self.val["C"] * math.pow(self.val["viscousity of air"]/self.val["viscousity at STP"], 2*self.val["n"] - 1)\
-                                       * math.pow(self.val["density of air"]/self.val["density at STP"], 1- self.val["n"])
+        self.val["C0"] = self.val["C"] * float(stp_correction(self.val["n"],
+                                                              self.val["density of air"],
+                                                              self.val["viscousity of air"]))
 
     def calculate_variance_and_confidence_values(self):
-        # variance of 𝑛, 𝑠_𝑛
-        self.val["variance of n"] = 1 / math.sqrt(self.val["variance of x"]) \
-                                    * math.sqrt((self.val["variance of y"] \
-                                                - self.val["n"] * self.val["covariance"]) / (self.val["N"] - 2))
-        # variance of ln⁡(𝐶), 𝑠_ln⁡(𝐶)
-        self.val["variance of ln(C)"] = self.val["variance of n"] * math.sqrt(self.val["mean squared of x"])
+        # variance of 𝑛(𝑠_𝑛), variance of ln⁡(𝐶)(𝑠_ln⁡(𝐶))는 fit_power_law에서 계산
         # t table value for N-2 and alpha
-        self.val["t"] = t.ppf(1 - self.val["alpha"], self.val["N"] - 2)
+        self.val["t"] = t_quantile(self.val["alpha"], self.val["N"] - 2)
         # 95% confidence value of n, 𝐼_𝑛
         self.val["margin of error of n"] = self.val["variance of n"] * self.val["t"]
         self.val["n range"] = [self.val["n"] - self.val["margin of error of n"],
@@ -166,10 +481,11 @@ class BlowerDoorTestCalculator:
         self.val["margin of error of ln(C)"] = self.val["variance of ln(C)"] * self.val["t"]
         self.val["C range"] = [self.val["C"]*math.exp(-self.val["margin of error of ln(C)"]),
                                self.val["C"]*math.exp(+self.val["margin of error of ln(C)"])]
-        self.val["C0 range"] = [self.val["C range"][0] * math.pow(self.val["viscousity of air"]/self.val["viscousity at STP"], 2*self.val["n"] - 1)\
-                                * math.pow(self.val["density of air"]/self.val["density at STP"], 1- self.val["n"]),
-                                self.val["C range"][1] * math.pow(self.val["viscousity of air"]/self.val["viscousity at STP"], 2*self.val["n"] - 1)\
-                                * math.pow(self.val["density of air"]/self.val["density at STP"], 1- self.val["n"])]
+        correction = float(stp_correction(self.val["n"],
+                                          self.val["density of air"],
+                                          self.val["viscousity of air"]))
+        self.val["C0 range"] = [self.val["C range"][0] * correction,
+                                self.val["C range"][1] * correction]
 
     # volumetric flow rate(㎥/h) for certain pressure
     def volumetric_flow_rate(self, dp=50):
@@ -206,7 +522,7 @@ class BlowerDoorTestCalculator:
         # Air change per hour at 50 pressure difference
         self.val["ACH50"] = self.val["Q50"] / self.interior_volume
         # leakage area at 50 Pa (㎡)
-        self.val["AL50"] = self.val["C0"] * math.pow(self.val["density at STP"]/2,0.5)*math.pow(50, self.val["n"]-0.5) / 3_600
+        self.val["AL50"] = float(leakage_area(self.val["C0"], self.val["n"]))
         
         # confidence intervals
         Q50s = self.volumetric_flow_rate()
@@ -216,11 +532,13 @@ class BlowerDoorTestCalculator:
         ns = [self.val["n"]] + self.val["n range"]
         self.val["n+-"] = f"{(ns[1]-ns[0])/ns[0]*100:+.1f}%/{(ns[2]-ns[0])/ns[0]*100:+.1f}%"
 
+        points = np.asarray(self.val["measured values"], dtype=float)
+        dp, vfra = points[:, 0], points[:, 1]
         # SST(Total Sum of Squares)
-        mean_of_vfra = statistics.mean([j for [_,j] in self.val["measured values"]])
-        self.val["SST"] = sum([(j - mean_of_vfra)**2 for [_, j] in self.val["measured values"]])
+        self.val["SST"] = float(((vfra - vfra.mean())**2).sum())
         # SSE(Explained Sum of Square)
-        self.val["SSR"] = sum([(j - self.volumetric_flow_rate(i)[0])**2 for [i, j] in self.val["measured values"]])
+        predicted = self.val["C0"] * np.power(dp, self.val["n"])
+        self.val["SSR"] = float(((vfra - predicted)**2).sum())
         # R-squared
         self.val["r^2"] = 1 - (self.val["SSR"] / self.val["SST"])
 
@@ -0,0 +1,365 @@
+import threading
+import numpy as np
+import sensor_and_controller
+import timing
+
+'''
+차압 센서 연속 수집
+
+stream = acquisition.pressure_stream()          # 포트별 1개, 최초 호출 시 시작
+stream.stats(1.0)                               # 최근 1초 {"n", "mean", "median", "std"}
+stream.mean(10)                                 # 최근 10초 평균 (Pa), 샘플이 없으면 None
+stream.wait(5)                                  # 5초 분량의 샘플이 쌓일 때까지 대기 (sleep 대신)
+stream.recent(0.5)                              # 최근 0.5초 평균, 비어 있으면 새 샘플 대기
+stream.average(1)                               # 지금부터 1초 동안의 평균
+
+측정/제어 코드는 센서 포트를 직접 읽지 않고 수집 스레드의 버퍼에서 구간 통계를 읽는다.
+가상 시계에서는 수집 스레드의 센서 읽기가 시간을 진행시키므로, 대기는 timing.sleep 대신
+stream.wait를 사용해야 대기 구간에도 샘플이 쌓인다.
+
+environment = acquisition.environment_stream()  # 온습도/대기압 (/dev/ttyUSB1), 1초 간격
+environment.average(start, end)                 # 구간 평균 {"temperature", ...}
+'''
+
+
+class RingBuffer:
+    """Fixed-capacity (timestamp, value) buffer backed by NumPy arrays; O(1) append."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self.count = 0
+        self._head = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, value):
+        with self._lock:
+            self.times[self._head] = timestamp
+            self.values[self._head] = value
+            self._head = (self._head + 1) % self.capacity
+            self.count += 1
+
+    def clear(self):
+        with self._lock:
+            self.count = 0
+            self._head = 0
+
+    def latest(self):
+        with self._lock:
+            if not self.count:
+                return None
+            i = (self._head - 1) % self.capacity
+            return self.times[i], self.values[i]
+
+    def oldest(self):
+        with self._lock:
+            if not self.count:
+                return None
+            i = self._head if self.count > self.capacity else 0
+            return self.times[i], self.values[i]
+
+    def _segments(self):
+        # 시간 순 (시작, 끝) 구간: 한 바퀴 돌기 전 1개, 돈 후 [head:] + [:head]
+        if self.count <= self.capacity or self._head == 0:
+            return [(0, len(self))]
+        return [(self._head, self.capacity), (0, self._head)]
+
+    def window(self, seconds=None, now=None):
+        """(times, values) in time order, limited to the last `seconds` if given.
+
+        The window start is found by binary search on the stored arrays, so only
+        the returned samples are copied.
+        """
+        with self._lock:
+            segments = self._segments()
+            if seconds is not None and self.count:
+                if now is None:
+                    now = self.times[(self._head - 1) % self.capacity]
+                threshold = now - seconds
+                # 시간 순 정렬이므로 구간별 이진 탐색으로 시작 위치 결정
+                if len(segments) == 2 and self.times[0] < threshold:
+                    # 시작 위치가 최근 구간 [:head] 안에 있음
+                    segments = [(0, self._head)]
+                start, end = segments[0]
+                start += int(np.searchsorted(self.times[start:end], threshold, side="left"))
+                segments[0] = (start, end)
+            times = np.concatenate([self.times[start:end] for start, end in segments])
+            values = np.concatenate([self.values[start:end] for start, end in segments])
+        return times, values
+
+
+class PressureStream(threading.Thread):
+    """Polls a pressure source as fast as it answers (at most every `min_period` s)
+    and keeps timestamped samples."""
+
+    def __init__(self, read_sample, capacity=36_000, clock=timing.monotonic, min_period=0.02,
+                 max_backoff=2.0):
+        super().__init__(daemon=True)
+        self.read_sample = read_sample
+        self.buffer = RingBuffer(capacity)
+        self.clock = clock
+        self.min_period = min_period
+        self.max_backoff = max_backoff
+        self.errors = 0
+        # 마지막 샘플 시각, 새 샘플 도착 알림
+        self.last_time = None
+        self._arrived = threading.Condition()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        delay = self.min_period
+        while not self._stop_event.is_set():
+            start = self.clock()
+            try:
+                value = self.read_sample()
+            except Exception as e:
+                print(f"pressure stream error: {e}")
+                value = None
+            if value is None:
+                # 센서 미연결 시 재시도 간격을 늘림 (실제 시간 대기)
+                self.errors += 1
+                self._stop_event.wait(delay)
+                delay = min(self.max_backoff, delay * 2)
+                continue
+            delay = self.min_period
+            now = self.clock()
+            with self._arrived:
+                self.buffer.append(now, value)
+                self.last_time = now
+                self._arrived.notify_all()
+            # 즉시 반환되는 측정 함수(테스트 모드)는 min_period 간격으로 수집
+            if now - start < self.min_period:
+                timing.sleep(self.min_period - (now - start))
+
+    def stop(self, timeout=2):
+        self._stop_event.set()
+        with self._arrived:
+            self._arrived.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+
+    def wait_until(self, timestamp, timeout=None):
+        """Block (real time) until a sample at or after `timestamp` arrives; False on timeout or stop."""
+        with self._arrived:
+            self._arrived.wait_for(lambda: self._stop_event.is_set()
+                                   or self.last_time is not None and self.last_time >= timestamp, timeout)
+            return self.last_time is not None and self.last_time >= timestamp
+
+    def wait(self, seconds):
+        """Wait until the next `seconds` of samples are buffered (replaces sleep)."""
+        target = self.clock() + seconds
+        if not self.wait_until(target, seconds + self.max_backoff + 1):
+            # 센서 응답이 없으면 시계 기준으로 남은 시간 대기
+            timing.sleep(target - self.clock())
+
+    def average(self, seconds):
+        """Mean (Pa) of the samples of the next `seconds`."""
+        while True:
+            self.wait(seconds)
+            mean = self.mean(seconds)
+            if mean is not None:
+                return mean
+            if self._stop_event.is_set():
+                raise IOError("pressure stream stopped")
+
+    def recent(self, seconds):
+        """Mean (Pa) of the last `seconds`; waits for new samples if there are none."""
+        mean = self.mean(seconds)
+        return mean if mean is not None else self.average(seconds)
+
+    def latest(self):
+        sample = self.buffer.latest()
+        return None if sample is None else sample[1]
+
+    def stats(self, seconds):
+        _, values = self.buffer.window(seconds, self.clock())
+        if not len(values):
+            return {"n": 0, "mean": None, "median": None, "std": None}
+        return {"n": len(values),
+                "mean": float(values.mean()),
+                "median": float(np.median(values)),
+                "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0}
+
+    def mean(self, seconds):
+        return self.stats(seconds)["mean"]
+
+    def median(self, seconds):
+        return self.stats(seconds)["median"]
+
+    def std(self, seconds):
+        return self.stats(seconds)["std"]
+
+
+class EnvironmentStream(threading.Thread):
+    """Samples temperature, humidity and barometric pressure every `period` seconds
+    (real time), keeping timestamped values on `clock`."""
+
+    fields = ("temperature", "relative_humidity", "atmospheric_pressure")
+
+    def __init__(self, read_sample, period=1.0, capacity=36_000, clock=timing.monotonic, max_backoff=30.0):
+        super().__init__(daemon=True)
+        self.read_sample = read_sample
+        self.period = period
+        self.max_backoff = max_backoff
+        self.buffers = {name: RingBuffer(capacity) for name in self.fields}
+        self.clock = clock
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        delay = self.period
+        while not self._stop_event.is_set():
+            sample = self.read_sample()
+            if sample is None:
+                # 센서 미연결 시 재시도 간격을 늘림
+                self.errors += 1
+                delay = min(self.max_backoff, delay * 2)
+            else:
+                now = self.clock()
+                for name in self.fields:
+                    if sample.get(name) is not None:
+                        self.buffers[name].append(now, sample[name])
+                delay = self.period
+            # 가상 시계를 진행시키지 않도록 실제 시간으로 대기
+            self._stop_event.wait(delay)
+
+    def stop(self, timeout=2):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def samples(self):
+        return min(len(buffer) for buffer in self.buffers.values())
+
+    def average(self, start=None, end=None):
+        """Mean of each field over [start, end]; the nearest earlier sample if the
+        interval holds none, None if nothing was sampled."""
+        result = {}
+        for name, buffer in self.buffers.items():
+            times, values = buffer.window()
+            if not len(times):
+                result[name] = None
+                continue
+            lo = 0 if start is None else np.searchsorted(times, start, side="left")
+            hi = len(times) if end is None else np.searchsorted(times, end, side="right")
+            if hi > lo:
+                result[name] = float(values[lo:hi].mean())
+            else:
+                result[name] = float(values[max(hi - 1, 0)])
+        return result
+
+
+class SettleDetector:
+    """Decides when pressure has settled: rolling slope and scatter over `window` seconds
+    both below their limits. Reads its own buffer, or a shared one (e.g. a PressureStream's)
+    from time `since` on."""
+
+    def __init__(self, window=3.0, slope_limit=0.3, std_limit=1.5, capacity=2_000, buffer=None, since=None):
+        self.window = window
+        # 허용 기울기 (Pa/s), 허용 표준편차 (Pa, 추세 제거 후)
+        self.slope_limit = slope_limit
+        self.std_limit = std_limit
+        self.buffer = buffer if buffer is not None else RingBuffer(capacity)
+        # 판정 시작 시각 (이전 샘플 제외), None이면 버퍼의 첫 샘플부터
+        self.since = since
+
+    def add(self, timestamp, pressure):
+        self.buffer.append(timestamp, pressure)
+
+    def state(self):
+        times, values = self.buffer.window(self.window)
+        if len(times) < 3:
+            return None
+        start = self.since if self.since is not None else self.buffer.oldest()[0]
+        if times[-1] - start < self.window:
+            return None
+        # 최소 제곱 기울기와 잔차 표준편차
+        dt = times - times.mean()
+        dp = values - values.mean()
+        slope = (dt * dp).sum() / (dt * dt).sum()
+        residual = dp - slope * dt
+        return {"slope": float(slope), "std": float(residual.std(ddof=2)) if len(times) > 3 else 0.0}
+
+    def settled(self):
+        state = self.state()
+        return state is not None \
+            and abs(state["slope"]) <= self.slope_limit and state["std"] <= self.std_limit
+
+
+def wait_for_settle(stream, timeout=30.0, window=3.0, slope_limit=0.3, std_limit=1.5, check_period=0.1):
+    """Wait until the samples `stream` collects from now on have settled, or `timeout`;
+    returns (settled, elapsed seconds)."""
+    time_start = stream.clock()
+    # 수집 스레드 버퍼를 직접 판정 (별도 센서 읽기 없음)
+    detector = SettleDetector(window, slope_limit, std_limit, buffer=stream.buffer, since=time_start)
+    while True:
+        stream.wait(check_period)
+        elapsed = stream.clock() - time_start
+        if detector.settled():
+            return True, elapsed
+        if elapsed >= timeout:
+            return False, elapsed
+
+
+def modbus_pressure_reader(port='/dev/ttyUSB0', baudrate=9600, slave=1, register=1):
+    # Lefoo 차압 센서 1회 읽기 (Pa), 오류 프레임은 None
+    session = sensor_and_controller.sensor_session(port, baudrate)
+
+    def read_sample():
+        return sensor_and_controller.device_call("pressure", sensor_and_controller.lefoo_read,
+                                                 session, slave, register)
+
+    return read_sample
+
+
+# (종류, 포트)별 수집 스레드
+_streams = {}
+_streams_lock = threading.Lock()
+
+
+def pressure_stream(port='/dev/ttyUSB0', baudrate=9600, read_sample=None, test=False):
+    """Shared, already-started stream for `port` (device backend if installed,
+    random values in test mode)."""
+    with _streams_lock:
+        stream = _streams.get(("pressure", port))
+        if stream is None or not stream.is_alive():
+            if read_sample is None:
+                backend = sensor_and_controller.get_backend()
+                if backend:
+                    def read_sample():
+                        return sensor_and_controller.device_call("pressure", backend.read_pressure)
+                elif test:
+                    def read_sample():
+                        return sensor_and_controller.pressure_read(0, test=True)
+                else:
+                    read_sample = modbus_pressure_reader(port, baudrate)
+            stream = PressureStream(read_sample)
+            stream.start()
+            _streams[("pressure", port)] = stream
+        return stream
+
+
+def environment_stream(port='/dev/ttyUSB1', baudrate=9600, read_sample=None, period=1.0):
+    """Shared, already-started temperature/humidity/barometer stream for `port`."""
+    with _streams_lock:
+        stream = _streams.get(("environment", port))
+        if stream is None or not stream.is_alive():
+            if read_sample is None:
+                # backend 또는 센서, 장치 I/O 스케줄러 경유
+                def read_sample():
+                    return sensor_and_controller.environment_read(port, baudrate, test=False)
+            stream = EnvironmentStream(read_sample, period)
+            stream.start()
+            _streams[("environment", port)] = stream
+        return stream
+
+
+def stop_streams():
+    with _streams_lock:
+        for stream in _streams.values():
+            stream.stop()
+        _streams.clear()
@@ -0,0 +1,264 @@
+import os
+import re
+import csv
+import sys
+import glob
+import json
+import argparse
+import numpy as np
+import ACH_calculator
+
+'''
+python batch_calculator.py "./measurements/*.json" --conditions ./conditions --output results.csv
+
+measurements/{depressurization|pressurization}_{yymmdd-HHMMSS}.json 마다
+같은 시각 또는 직전 시각의 conditions/conditions_{yymmdd-HHMMSS}.json 을 매칭하여
+모든 시험을 2차원 배열(시험 × 측정점)로 쌓아 한 번에 계산한다.
+'''
+
+TIMESTAMP = re.compile(r"(\d{6}-\d{6})")
+
+# 결과 테이블 열 순서
+COLUMNS = ["measurement",
+           "conditions",
+           "test",
+           "fan_cover",
+           "fan_count",
+           "interior_volume",
+           "temperature",
+           "relative_humidity",
+           "atmospheric_pressure",
+           "N",
+           "n",
+           "n_min",
+           "n_max",
+           "C",
+           "C0",
+           "C0_min",
+           "C0_max",
+           "t",
+           "Q50",
+           "Q50_min",
+           "Q50_max",
+           "ACH50",
+           "AL50",
+           "r^2"]
+
+
+def _expand(pattern):
+    # 디렉터리가 주어지면 내부 json 전체
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.json")
+    return sorted(glob.glob(pattern))
+
+
+def _timestamp(path):
+    found = TIMESTAMP.search(os.path.basename(path))
+    return found.group(1) if found else None
+
+
+def pair_files(measurements, conditions):
+    """Pair each measurement file with the latest conditions file not newer than it."""
+    stamped = sorted((_timestamp(c), c) for c in _expand(conditions) if _timestamp(c))
+    stamps = [s for s, _ in stamped]
+    pairs = []
+    for path in _expand(measurements):
+        stamp = _timestamp(path)
+        if stamp is None:
+            continue
+        # yymmdd-HHMMSS 는 문자열 정렬 = 시간 정렬
+        index = np.searchsorted(stamps, stamp, side="right") - 1
+        if index < 0:
+            continue
+        pairs.append((path, stamped[index][1]))
+    return pairs
+
+
+# 회귀 신뢰 구간에 필요한 최소 측정점 수 (자유도 N-2 ≥ 1)
+MIN_STATIONS = 3
+
+
+def check_test(data):
+    """Raise ValueError/KeyError if a loaded test can't be fitted."""
+    for key in ("interior volume", "temperature", "relative_humidity", "atmospheric_pressure"):
+        float(data[key])
+    points = data["measured_value"]
+    if not isinstance(points, list):
+        raise ValueError("measured_value is not a list")
+    fans = len(data["fans"]) if data.get("fans") else None
+    stations = 0
+    for point in points:
+        if not isinstance(point, list) or len(point) < 2:
+            raise ValueError(f"malformed station {point!r}")
+        pressure, duty = point[:2]
+        if fans is not None:
+            # 다중 팬: 측정점별 압력 목록, 팬별 duty 목록
+            if np.ndim(duty) != 1 or len(duty) != fans:
+                raise ValueError(f"station {point!r} needs {fans} fan duties")
+            pressure = np.mean(pressure)
+        pressure = float(pressure)
+        # 압력 0 이하, NaN은 회귀(로그)에서 제외되므로 측정점 수에 포함하지 않음
+        if np.isfinite(pressure) and pressure > 0 and np.isfinite(np.asarray(duty, dtype=float)).all():
+            stations += 1
+    if stations < MIN_STATIONS:
+        raise ValueError(f"{stations} usable stations, at least {MIN_STATIONS} needed")
+
+
+def load_tests(pairs):
+    """Loaded tests plus [(measurement, error)] for files that can't be read or fitted."""
+    tests, failures = [], []
+    for measurement, conditions in pairs:
+        try:
+            with open(measurement, 'r') as file:
+                data = json.load(file)
+            with open(conditions, 'r') as file:
+                data.update(json.load(file))
+            check_test(data)
+        except Exception as e:
+            failures.append((measurement, f"{type(e).__name__}: {e}"))
+            continue
+        data["measurement"] = measurement
+        data["conditions"] = conditions
+        tests.append(data)
+    return tests, failures
+
+
+def stack_tests(tests):
+    """Stack tests into NaN-padded (tests × points) pressure/duty arrays plus per-test columns.
+
+    Multi-fan tests (per-fan duty lists) get their averaged tap pressure here and
+    NaN duty; calculate_batch fills in their summed flow separately.
+    """
+    width = max(len(test["measured_value"]) for test in tests)
+    pressure = np.full((len(tests), width), np.nan)
+    duty = np.full((len(tests), width), np.nan)
+    for row, test in enumerate(tests):
+        if test.get("fans"):
+            pressure[row, :len(test["measured_value"])] = [np.mean(point[0]) for point in test["measured_value"]]
+            continue
+        points = np.asarray([point[:2] for point in test["measured_value"]], dtype=float)
+        pressure[row, :len(points)] = points[:, 0]
+        duty[row, :len(points)] = points[:, 1]
+
+    columns = {
+        "measurement": [test["measurement"] for test in tests],
+        "conditions": [test["conditions"] for test in tests],
+        "test": [test.get("test", "") for test in tests],
+        "fan_cover": [test.get("fan_cover", "none").lower() for test in tests],
+        "fan_count": np.array([len(test["fans"]) if test.get("fans") else int(test.get("fan_count", 2))
+                               for test in tests]),
+        "interior_volume": np.array([float(test["interior volume"]) for test in tests]),
+        "temperature": np.array([float(test["temperature"]) for test in tests]),
+        "relative_humidity": np.array([float(test["relative_humidity"]) for test in tests]),
+        "atmospheric_pressure": np.array([float(test["atmospheric_pressure"]) for test in tests]),
+    }
+    return pressure, duty, columns
+
+
+def calculate_batch(tests, alpha=0.025, registry=None):
+    """Fit every test at once and return a dict of equal-length result columns."""
+    pressure, duty, columns = stack_tests(tests)
+    if registry is None:
+        registry = ACH_calculator.fan_coefficient_registry()
+    # PWM duty → 풍량(㎥/h), 시험별 커버 계수 조회
+    flow = registry.duty_to_flow(duty, columns["fan_cover"], columns["fan_count"])
+    # 다중 팬 시험: 팬별 커버 곡선으로 변환한 풍량 합
+    for row, test in enumerate(tests):
+        if test.get("fans"):
+            curves = [registry.curve(fan.get("cover", columns["fan_cover"][row]).lower())
+                      for fan in test["fans"]]
+            _, flows = ACH_calculator.station_flows(test["measured_value"], curves)
+            flow[row, :len(flows)] = flows
+
+    # 회귀 (시험별 행 단위)
+    fit = ACH_calculator.fit_power_law(pressure, flow)
+    n = fit["n"]
+    N = fit["N"]
+    # 밀도, 점도 보정
+    air = ACH_calculator.air_properties(columns["temperature"],
+                                        columns["relative_humidity"],
+                                        columns["atmospheric_pressure"])
+    correction = ACH_calculator.stp_correction(n, air["density of air"], air["viscousity of air"])
+    C0 = fit["C"] * correction
+    # 95% 신뢰 구간
+    t_value = ACH_calculator.t_quantile(alpha, N - 2)
+    margin_n = fit["variance of n"] * t_value
+    margin_lnC = fit["variance of ln(C)"] * t_value
+    n_min, n_max = n - margin_n, n + margin_n
+    C0_min = C0 * np.exp(-margin_lnC)
+    C0_max = C0 * np.exp(+margin_lnC)
+    # Q50, ACH50, AL50
+    Q50 = C0 * np.power(50, n)
+    ACH50 = Q50 / columns["interior_volume"]
+    AL50 = ACH_calculator.leakage_area(C0, n)
+    # r^2 (BlowerDoorTestCalculator.calculate_results 와 동일한 정의)
+    mask = fit["mask"]
+    mean_flow = np.nansum(flow, axis=1) / N
+    SST = np.where(mask, (flow - mean_flow[:, None])**2, 0).sum(axis=1)
+    predicted = C0[:, None] * np.power(pressure, n[:, None])
+    SSR = np.where(mask, (flow - predicted)**2, 0).sum(axis=1)
+
+    columns.update({
+        "N": N,
+        "n": n,
+        "n_min": n_min,
+        "n_max": n_max,
+        "C": fit["C"],
+        "C0": C0,
+        "C0_min": C0_min,
+        "C0_max": C0_max,
+        "t": t_value,
+        "Q50": Q50,
+        "Q50_min": C0_min * np.power(50, n_min),
+        "Q50_max": C0_max * np.power(50, n_max),
+        "ACH50": ACH50,
+        "AL50": AL50,
+        "r^2": 1 - SSR / SST,
+    })
+    return {key: np.asarray(columns[key]).tolist() for key in COLUMNS}
+
+
+def write_csv(results, path):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        writer.writerows(zip(*(results[key] for key in COLUMNS)))
+
+
+def write_columnar_json(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch blower door test calculation")
+    parser.add_argument("measurements", nargs="?", default="./measurements",
+                        help="directory or glob of measurement json files")
+    parser.add_argument("--conditions", default="./conditions",
+                        help="directory or glob of conditions json files")
+    parser.add_argument("--output", default="./calculations/batch_results.csv",
+                        help="output path (.csv or .json)")
+    args = parser.parse_args(argv)
+
+    pairs = pair_files(args.measurements, args.conditions)
+    if not pairs:
+        print("No measurement/conditions pairs found.")
+        return 1
+    tests, failures = load_tests(pairs)
+    for measurement, error in failures:
+        print(f"skipped {measurement}: {error}")
+    if not tests:
+        print("No valid tests to calculate.")
+        return 1
+    results = calculate_batch(tests)
+
+    if args.output.endswith(".json"):
+        write_columnar_json(results, args.output)
+    else:
+        write_csv(results, args.output)
+    print(f"{len(tests)} tests → {args.output} ({len(failures)} skipped)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import math
+import threading
+import numpy as np
+import rig
+import sensor_and_controller
+import ACH_calculator
+import timing
+
+'''
+장치 backend
+
+sensor_and_controller.set_backend(devices.SimulatedBackend())   # 가상 시험 장비
+sensor_and_controller.set_backend(devices.HardwareBackend())    # 실제 센서 + pigpio
+sensor_and_controller.set_backend(None)                         # 기존 동작
+rig.set_rig(devices.SimulatedZones([devices.SimulatedHouse(C=100), devices.SimulatedHouse(C=120)],
+                                   ["none", "none"]).rig())                 # 구역 2개, 팬 2대 가상 장비
+
+backend가 설치되면 pressure_read, duty_set, fan_power, get_duty는 test 인자와
+관계없이 backend를 사용한다.
+'''
+
+
+class DeviceBackend:
+    """Pressure sensor, fan PWM and fan relay of one blower door rig."""
+
+    def read_pressure(self):
+        """One pressure sample (Pa), or None if the read failed."""
+        raise NotImplementedError
+
+    def set_duty(self, duty):
+        raise NotImplementedError
+
+    def set_power(self, on):
+        raise NotImplementedError
+
+    def read_environment(self):
+        """{"temperature", "relative_humidity", "atmospheric_pressure"}, or None if unavailable."""
+        return None
+
+    def close(self):
+        pass
+
+
+class HardwareBackend(DeviceBackend):
+    """Lefoo differential pressure sensor over Modbus RTU + pigpio fan controller."""
+
+    def __init__(self, port='/dev/ttyUSB0', baudrate=9600, slave=1, register=1, controller=None,
+                 environment_port='/dev/ttyUSB1'):
+        self.session = sensor_and_controller.sensor_session(port, baudrate)
+        self.environment_port = environment_port
+        self.slave = slave
+        self.register = register
+        self.controller = controller or sensor_and_controller.fan_controller()
+
+    def read_pressure(self):
+        return sensor_and_controller.lefoo_read(self.session, self.slave, self.register)
+
+    def set_duty(self, duty):
+        self.controller.set_duty(duty)
+
+    def set_power(self, on):
+        self.controller.set_power(on)
+
+    def read_environment(self):
+        return sensor_and_controller.modbus_environment(self.environment_port)
+
+    def close(self):
+        self.controller.close()
+
+
+class SimulatedHouse:
+    """Envelope following Q = C·ΔP^n, with first-order pressure lag and wind gusts."""
+
+    def __init__(self, C=200.0, n=0.65, lag=2.0, gust_pa=1.0, gust_time=5.0, seed=None):
+        self.C = C
+        self.n = n
+        # 압력 응답 시정수 (s)
+        self.lag = lag
+        # 바람 압력 변동 (Ornstein-Uhlenbeck 과정, 표준편차 Pa / 상관 시간 s)
+        self.gust_pa = gust_pa
+        self.gust_time = gust_time
+        self.rng = np.random.default_rng(seed)
+        self.pressure = 0.0
+        self.gust = 0.0
+
+    def steady_pressure(self, flow):
+        # ΔP = (Q / C)^(1/n)
+        return math.pow(max(flow, 0.0) / self.C, 1 / self.n)
+
+    def advance(self, flow, dt):
+        if dt <= 0:
+            return self.pressure + self.gust
+        target = self.steady_pressure(flow)
+        self.pressure += (target - self.pressure) * (1 - math.exp(-dt / self.lag))
+        if self.gust_pa:
+            decay = math.exp(-dt / self.gust_time)
+            self.gust = self.gust * decay \
+                + self.gust_pa * math.sqrt(1 - decay * decay) * self.rng.standard_normal()
+        return self.pressure + self.gust
+
+
+class SimulatedBackend(DeviceBackend):
+    """Simulated house + fan; fan flow comes from the fan_coefficients.json curves."""
+
+    def __init__(self, house=None, cover="none", fan_count=2, noise_pa=0.3,
+                 sample_period=0.02, registry=None, clock=None, seed=None, environment=None):
+        self.house = house or SimulatedHouse(seed=seed)
+        registry = registry or ACH_calculator.fan_coefficient_registry()
+        self.fan_curve = registry.curve(cover)
+        self.fan_count = fan_count
+        # 센서 잡음 (Pa), 센서 1회 응답 시간 (s)
+        self.noise_pa = noise_pa
+        self.sample_period = sample_period
+        # 기본값은 timing 모듈 (가상 시계 설정 시 자동 적용)
+        self.clock = clock or timing
+        self.rng = np.random.default_rng(seed)
+        # 온습도/대기압 (℃, %RH, Pa)
+        self.environment = dict(environment or {"temperature": 22.0,
+                                                "relative_humidity": 45.0,
+                                                "atmospheric_pressure": 100800.0})
+        self.duty = 0
+        self.power = 1
+        self._last = self.clock.monotonic()
+        self._lock = threading.Lock()
+
+    def flow(self):
+        # duty 0 또는 전원 차단 시 팬 정지
+        if not self.power or self.duty <= 0:
+            return 0.0
+        return float(self.fan_curve.flow(self.duty, self.fan_count))
+
+    def _advance(self):
+        now = self.clock.monotonic()
+        pressure = self.house.advance(self.flow(), now - self._last)
+        self._last = now
+        return pressure
+
+    def read_pressure(self):
+        self.clock.sleep(self.sample_period)
+        with self._lock:
+            pressure = self._advance()
+        return pressure + self.noise_pa * self.rng.standard_normal()
+
+    def set_duty(self, duty):
+        with self._lock:
+            self._advance()
+            self.duty = int(duty)
+
+    def set_power(self, on):
+        with self._lock:
+            self._advance()
+            self.power = on
+
+    def read_environment(self):
+        # 센서 분해능 수준의 잡음 (0.1 ℃, 0.1 %RH, 10 Pa)
+        with self._lock:
+            noise = self.rng.standard_normal(3)
+        return {"temperature": self.environment["temperature"] + 0.1 * noise[0],
+                "relative_humidity": self.environment["relative_humidity"] + 0.1 * noise[1],
+                "atmospheric_pressure": self.environment["atmospheric_pressure"] + 10 * noise[2]}
+
+
+class SimulatedZones:
+    """Several independent zones (SimulatedHouse each), fan i blowing into zone i
+    (or every fan into one zone); builds a rig.Rig of simulated fans and taps."""
+
+    def __init__(self, houses, covers, noise_pa=0.3, registry=None, clock=None, seed=None):
+        registry = registry or ACH_calculator.fan_coefficient_registry()
+        self.houses = houses
+        self.covers = covers
+        self.fan_curves = [registry.curve(cover) for cover in covers]
+        self.noise_pa = noise_pa
+        self.clock = clock or timing
+        self.rng = np.random.default_rng(seed)
+        self.duties = [0] * len(covers)
+        self._last = self.clock.monotonic()
+        self._lock = threading.Lock()
+
+    def _zone_flows(self):
+        flows = [float(curve.flow(duty)) if duty > 0 else 0.0
+                 for curve, duty in zip(self.fan_curves, self.duties)]
+        if len(self.houses) == 1:
+            return [sum(flows)]
+        return flows
+
+    def _advance(self):
+        now = self.clock.monotonic()
+        pressures = [house.advance(flow, now - self._last)
+                     for house, flow in zip(self.houses, self._zone_flows())]
+        self._last = now
+        return pressures
+
+    def set_duty(self, index, duty):
+        with self._lock:
+            self._advance()
+            self.duties[index] = int(duty)
+
+    def read_pressure(self, index):
+        with self._lock:
+            pressure = self._advance()[index]
+            return pressure + self.noise_pa * self.rng.standard_normal()
+
+    def rig(self):
+        fans = [rig.FanChannel(f"fan{i + 1}", SimulatedFanDriver(self, i), cover)
+                for i, cover in enumerate(self.covers)]
+        taps = [rig.PressureTap(f"zone{i + 1}", lambda i=i: self.read_pressure(i), device=f"pressure:zone{i + 1}")
+                for i in range(len(self.houses))]
+        return rig.Rig(fans, taps)
+
+
+class SimulatedFanDriver:
+    """Duty/power driver of fan `index` in SimulatedZones."""
+
+    def __init__(self, zones, index):
+        self.zones = zones
+        self.index = index
+
+    def set_duty(self, duty):
+        self.zones.set_duty(self.index, duty)
+
+    def set_power(self, on):
+        if not on:
+            self.zones.set_duty(self.index, 0)
+
+    def close(self):
+        self.zones.set_duty(self.index, 0)
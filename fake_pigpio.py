@@ -0,0 +1,34 @@
+'''
+pigpiod 없이 FanController를 시험하기 위한 가짜 pigpio 연결
+
+controller = sensor_and_controller.FanController(pi_factory=fake_pigpio.pi)
+controller.set_duty(40)
+controller._pi.calls   # [("hardware_PWM", 18, 1000, 400000)]
+'''
+
+
+class pi:
+    """Minimal stand-in for pigpio.pi that records every command."""
+
+    def __init__(self, host="localhost", port=8888, connected=True):
+        self.connected = connected
+        self.calls = []
+        self.levels = {}
+        self.pwm = {}
+
+    def hardware_PWM(self, gpio, frequency, duty_cycle):
+        self.calls.append(("hardware_PWM", gpio, frequency, duty_cycle))
+        self.pwm[gpio] = (frequency, duty_cycle)
+        return 0
+
+    def write(self, gpio, level):
+        self.calls.append(("write", gpio, level))
+        self.levels[gpio] = level
+        return 0
+
+    def read(self, gpio):
+        return self.levels.get(gpio, 0)
+
+    def stop(self):
+        self.calls.append(("stop",))
+        self.connected = False
@@ -0,0 +1,71 @@
+import numpy as np
+
+'''
+fan_coefficients.json 방향별(forward / reverse) 보정 곡선 형식
+
+직선      {"slope": 9.21069, "intercept": 935.46713}
+다항식    {"polynomial": [a0, a1, a2, ...]}         # flow = a0 + a1·duty + a2·duty² + ...
+보간 표   {"table": [[duty, flow], [duty, flow], ...]}  # 구간 선형 보간, 양 끝은 끝 구간으로 외삽
+
+커버별 선택 항목
+"reverse_threshold": 50                              # duty < 50 forward, 그 외 reverse
+'''
+
+
+class FanCurve:
+    """Vectorized duty(%) → flow(㎥/h) curve for one fan direction."""
+
+    def __init__(self, polynomial=None, table=None):
+        self.polynomial = None if polynomial is None else np.asarray(polynomial, dtype=float)
+        self.table = None
+        if table is not None:
+            table = np.asarray(table, dtype=float)
+            # 구간 보간에 최소 2행 [duty, flow] 필요
+            if table.ndim != 2 or table.shape[1] != 2 or len(table) < 2:
+                raise ValueError("fan curve table needs at least 2 [duty, flow] rows")
+            table = table[np.argsort(table[:, 0])]
+            # 같은 duty가 두 번 나오면 구간 폭 0 → 0 나누기
+            if np.any(np.diff(table[:, 0]) <= 0):
+                raise ValueError("fan curve table duties must be distinct")
+            self.table = (np.ascontiguousarray(table[:, 0]), np.ascontiguousarray(table[:, 1]))
+
+    @classmethod
+    def from_config(cls, config):
+        if "table" in config:
+            return cls(table=config["table"])
+        if "polynomial" in config:
+            return cls(polynomial=config["polynomial"])
+        return cls(polynomial=[config["intercept"], config["slope"]])
+
+    def __call__(self, duty):
+        duty = np.asarray(duty, dtype=float)
+        if self.table is None:
+            # Horner 방식 다항식 계산
+            return np.polynomial.polynomial.polyval(duty, self.polynomial)
+        xs, ys = self.table
+        # 이진 탐색으로 구간 선택 (양 끝 구간은 외삽)
+        i = np.clip(np.searchsorted(xs, duty, side="right"), 1, len(xs) - 1)
+        x0, x1 = xs[i - 1], xs[i]
+        y0, y1 = ys[i - 1], ys[i]
+        return y0 + (duty - x0) * (y1 - y0) / (x1 - x0)
+
+
+class FanCurveSet:
+    """Forward/reverse curves of one fan cover."""
+
+    def __init__(self, forward, reverse, reverse_threshold=50):
+        self.forward = forward
+        self.reverse = reverse
+        self.reverse_threshold = reverse_threshold
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(FanCurve.from_config(config["forward"]),
+                   FanCurve.from_config(config["reverse"]),
+                   config.get("reverse_threshold", 50))
+
+    def flow(self, duty, fan_count=1):
+        duty = np.asarray(duty, dtype=float)
+        return np.where(duty < self.reverse_threshold,
+                        self.forward(duty),
+                        self.reverse(duty)) * fan_count
@@ -43,7 +43,7 @@ def reverse_vfra(results, vfra):
     dp_max = math.pow(vfra_max / results["C0"], 1 / results["n"])
     return [dp_min, dp_max]
 
-def plot_graph(resultsd, resultsp, report):
+def plot_graph(resultsd, resultsp, report, output='./graph.png', backup=True):
     # 폰트 설정
     font_path = './NanumSquare_acL.ttf'
     font8 = font_manager.FontProperties(fname=font_path, size=8)
@@ -545,10 +545,13 @@ def plot_graph(resultsd, resultsp, report):
         plt.setp(labelsp, backgroundcolor=(1,1,1,0.5))  # 배경색을 흰색으로 설정
 
     # 백업 저장
-    now = datetime.now().strftime("%d%m%Y-%H%M%S")
-    plt.savefig(f'./graphs/graph_{now}.png', dpi=300, bbox_inches='tight')
+    if backup:
+        now = datetime.now().strftime("%d%m%Y-%H%M%S")
+        plt.savefig(f'./graphs/graph_{now}.png', dpi=300, bbox_inches='tight')
     # 사용할 그래프 저장
-    plt.savefig(f'./graph.png', dpi=300, bbox_inches='tight')
+    plt.savefig(output, dpi=300, bbox_inches='tight')
+    # 반복 호출 시 메모리 누적 방지
+    plt.close()
 
 if __name__ == '__main__':
 
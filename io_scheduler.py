@@ -0,0 +1,193 @@
+import time
+import atexit
+import asyncio
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+'''
+장치 I/O 스케줄러 (asyncio 이벤트 루프, 전용 스레드)
+
+scheduler = io_scheduler.get_scheduler()
+scheduler.call("pressure", session.transact, request, size)            # 호출 스레드에서 결과 대기
+future = scheduler.submit("fan", controller.set_duty, 50, priority=io_scheduler.COMMAND)
+scheduler.call_all([("fan:door1", set_duty, (50,), COMMAND), ("fan:door2", set_duty, (60,), COMMAND)])
+poll = scheduler.periodic("live", read, 0.1, callback)                # 주기 측정, poll.cancel()
+value = await scheduler.run("environment", read)                       # 루프 안의 coroutine에서
+
+장치마다 우선순위 작업 큐와 I/O 스레드가 하나씩 있어 서로 다른 장치의 요청은 동시에 실행되고,
+같은 장치에서는 actuator 명령(COMMAND)이 측정(READ)보다 먼저 처리된다.
+(대기 시간은 진행 중인 요청 1개 이내)
+
+Qt 연동: 이벤트 루프는 Qt와 별도 스레드에서 실행되며, 결과는 callback에서
+pyqtSignal을 emit하면 GUI 스레드로 queued 전달된다.
+'''
+
+# 작업 우선순위 (작을수록 먼저)
+COMMAND = 0
+READ = 1
+
+# 장치 I/O 스레드 표시 (같은 장치 안에서 재호출 시 직접 실행)
+_io_thread = threading.local()
+
+
+def _mark_io_thread(device):
+    _io_thread.device = device
+
+
+class _Device:
+    """Priority queue + single I/O thread of one device; keeps latency statistics."""
+
+    def __init__(self, name):
+        self.name = name
+        self.queue = asyncio.PriorityQueue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"io-{name}",
+                                           initializer=_mark_io_thread, initargs=(name,))
+        self.completed = 0
+        self.errors = 0
+        # 큐 대기 시간, 요청 처리 시간 최댓값 (s)
+        self.max_wait = 0.0
+        self.max_service = 0.0
+        self.worker = asyncio.get_running_loop().create_task(self._work())
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, queued, fn, args, future = await self.queue.get()
+            if future.done():
+                continue
+            start = time.monotonic()
+            try:
+                result = await loop.run_in_executor(self.executor, fn, *args)
+            except Exception as e:
+                self.errors += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            end = time.monotonic()
+            self.completed += 1
+            self.max_wait = max(self.max_wait, start - queued)
+            self.max_service = max(self.max_service, end - start)
+
+    def stats(self):
+        return {"queued": self.queue.qsize(),
+                "completed": self.completed,
+                "errors": self.errors,
+                "max wait": self.max_wait,
+                "max service": self.max_service}
+
+    def close(self):
+        self.worker.cancel()
+        self.executor.shutdown(wait=False)
+
+
+class IOScheduler:
+    """asyncio event loop on a dedicated thread, dispatching blocking device calls
+    to per-device I/O threads."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._devices = {}
+        self._sequence = itertools.count()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="io-scheduler", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+        # 남은 작업(장치 worker, 주기 측정) 취소 후 종료
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        for device in self._devices.values():
+            device.close()
+        self.loop.close()
+
+    def _device(self, name):
+        # 루프 스레드에서만 호출
+        device = self._devices.get(name)
+        if device is None:
+            device = self._devices[name] = _Device(name)
+        return device
+
+    async def run(self, device, fn, *args, priority=READ):
+        """Coroutine: run blocking `fn(*args)` on `device`'s I/O thread."""
+        future = self.loop.create_future()
+        self._device(device).queue.put_nowait(
+            (priority, next(self._sequence), time.monotonic(), fn, args, future))
+        return await future
+
+    def submit(self, device, fn, *args, priority=READ):
+        """Thread-safe: schedule `fn(*args)` on `device`; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(self.run(device, fn, *args, priority=priority), self.loop)
+
+    def call(self, device, fn, *args, priority=READ, timeout=None):
+        """Blocking form of submit() for worker threads (not the loop thread)."""
+        if getattr(_io_thread, "device", None) == device:
+            # 같은 장치의 I/O 스레드 안에서는 교착을 피하기 위해 직접 실행
+            return fn(*args)
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("IOScheduler.call() cannot block the event loop thread, use run()")
+        return self.submit(device, fn, *args, priority=priority).result(timeout)
+
+    def call_all(self, calls, timeout=None):
+        """Run [(device, fn, args, priority), ...] concurrently; blocks for the results, in order."""
+        async def gather():
+            return await asyncio.gather(*(self.run(device, fn, *args, priority=priority)
+                                          for device, fn, args, priority in calls))
+        return asyncio.run_coroutine_threadsafe(gather(), self.loop).result(timeout)
+
+    async def _periodic(self, device, fn, period, callback):
+        next_time = time.monotonic()
+        while True:
+            try:
+                callback(await self.run(device, fn))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"periodic {device} error: {e}")
+            # 지연된 주기는 따라잡지 않고 건너뜀 (지연 누적 방지)
+            next_time = max(next_time + period, time.monotonic())
+            await asyncio.sleep(next_time - time.monotonic())
+
+    def periodic(self, device, fn, period, callback):
+        """Call `callback(fn())` every `period` seconds; cancel() the returned future to stop."""
+        return asyncio.run_coroutine_threadsafe(self._periodic(device, fn, period, callback), self.loop)
+
+    def stats(self):
+        async def collect():
+            return {name: device.stats() for name, device in self._devices.items()}
+        return asyncio.run_coroutine_threadsafe(collect(), self.loop).result()
+
+    def close(self, timeout=2):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Shared scheduler, started on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = IOScheduler()
+        return _scheduler
+
+
+@atexit.register
+def close_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.close()
+            _scheduler = None
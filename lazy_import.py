@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import threading
+import importlib
+import subprocess
+
+'''
+무거운 모듈(scipy, matplotlib, openpyxl 등)을 처음 사용할 때 불러오기 위한 도구
+
+ACH_calculator = lazy_import.LazyModule("ACH_calculator")
+lazy_import.prewarm(ACH_calculator, graph_plotter)     # 백그라운드에서 미리 로드
+lazy_import.report_import_times(ACH_calculator, graph_plotter)   # 모듈별 import 시간 출력 (새 인터프리터)
+'''
+
+# 모듈 이름: 이 프로세스에서의 로드 시간(s), 먼저 로드된 모듈이 공통 의존 모듈 시간을 포함
+import_times = {}
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    time_start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    import_times[self._name] = time.perf_counter() - time_start
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def prewarm(*modules):
+    """Import `modules` one after another on a daemon thread."""
+    def run():
+        for module in modules:
+            try:
+                module._load()
+            except Exception as e:
+                print(f"prewarm failed: {module._name} ({e})")
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _importtime(names, executable=sys.executable):
+    # 새 인터프리터에서 -X importtime으로 names를 import, 최상위 모듈별 (self, cumulative) 초
+    code = "import " + ", ".join(names)
+    # 이 모듈과 같은 디렉터리의 모듈을 찾도록 경로 추가
+    path = [os.path.dirname(os.path.abspath(__file__)), os.environ.get("PYTHONPATH", "")]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in path if p))
+    result = subprocess.run([executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", 들여쓰기 없는 줄이 최상위
+        fields = line.split("|")
+        if len(fields) != 3 or not fields[0].startswith("import time:"):
+            continue
+        name = fields[2].rstrip()
+        if name[1:] in names and not name[1:2].isspace():
+            times[name[1:]] = (int(fields[0].split(":")[1]) / 1e6, int(fields[1]) / 1e6)
+    return times
+
+
+def report_import_times(*modules, file=sys.stdout):
+    """Print each module's import time measured alone in a fresh interpreter.
+
+    self: the module's own code; cumulative: including every dependency it pulls
+    in (numpy, scipy, ...). The total imports all modules together, so shared
+    dependencies are counted once.
+    """
+    names = [module._name if isinstance(module, LazyModule) else module for module in modules]
+    print(f"{'module':<24}{'self':>12}{'cumulative':>14}", file=file)
+    loaded = []
+    for name in names:
+        try:
+            self_time, cumulative = _importtime([name])[name]
+        except ImportError as e:
+            print(f"{name:<24}failed ({e})", file=file)
+            continue
+        loaded.append(name)
+        print(f"{name:<24}{self_time * 1000:9.1f} ms{cumulative * 1000:11.1f} ms", file=file)
+    together = _importtime(loaded)
+    print(f"{'total':<24}{'':12}{sum(c for _, c in together.values()) * 1000:11.1f} ms", file=file)
@@ -0,0 +1,67 @@
+import struct
+from functools import lru_cache
+
+'''
+Modbus RTU 프레임 (Read Holding Registers, function 0x03)
+
+요청: [slave][0x03][register hi][register lo][count hi][count lo][CRC lo][CRC hi]
+응답: [slave][0x03][byte count][data ...][CRC lo][CRC hi]
+
+Write Single Register (function 0x06), 응답은 요청과 동일 (echo)
+요청: [slave][0x06][register hi][register lo][value hi][value lo][CRC lo][CRC hi]
+'''
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_RESPONSE_SIZE = 8
+
+
+def _crc_table():
+    # CRC-16/MODBUS (reflected polynomial 0xA001) 바이트 단위 표
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC_TABLE = _crc_table()
+
+
+def crc16(data):
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ CRC_TABLE[(crc ^ byte) & 0xFF]
+    return crc
+
+
+@lru_cache(maxsize=None)
+def read_request(slave=1, register=1, count=1):
+    """Read-holding-registers request frame, built once per (slave, register, count)."""
+    body = struct.pack('>BBHH', slave, READ_HOLDING_REGISTERS, register, count)
+    # CRC는 하위 바이트 먼저
+    return body + struct.pack('<H', crc16(body))
+
+
+def response_size(count=1):
+    return 5 + 2 * count
+
+
+def parse_read_response(frame, slave=1, count=1, signed=True):
+    """Register values from a response frame, or None if the frame is invalid."""
+    # 길이, 주소, function, byte count 확인 후 CRC 검증
+    if len(frame) != response_size(count):
+        return None
+    if frame[0] != slave or frame[1] != READ_HOLDING_REGISTERS or frame[2] != 2 * count:
+        return None
+    if crc16(frame[:-2]) != frame[-2] | (frame[-1] << 8):
+        return None
+    return struct.unpack(('>%dh' if signed else '>%dH') % count, frame[3:-2])
+
+
+def write_request(slave, register, value):
+    """Write-single-register request frame; a valid response echoes it byte for byte."""
+    body = struct.pack('>BBHH', slave, WRITE_SINGLE_REGISTER, register, value & 0xFFFF)
+    return body + struct.pack('<H', crc16(body))
@@ -1,6 +1,16 @@
-import time
+import os
+import json
+import math
+from collections import deque
+from datetime import datetime
 from simple_pid import PID
 import sensor_and_controller
+import acquisition
+import schedule_planner
+import timing
+
+# 마지막 get_duty 제어 결과 요약 (제어기 비교용)
+last_summary = {}
 
 def duty_transformation(input_value, min_value, max_value):
     # 입력 값이 최소와 최대 값 사이에 있는지 확인
@@ -19,7 +29,116 @@ def duty_transformation(input_value, min_value, max_value):
 
     return round(transformed_value)
 
-def get_duty(target, delay, average_time, control_limit, duty_min=0, duty_max=100, test=True):
+class ControlTrace:
+    """Bounded in-memory control history, mirrored line by line to a JSONL file."""
+
+    def __init__(self, mode, directory="./measurements", maxlen=500):
+        self.history = deque(maxlen=maxlen)
+        self.path = None
+        self._file = None
+        if directory:
+            now = datetime.now().strftime("%y%m%d-%H%M%S")
+            self.path = os.path.join(directory, f"control_{mode}_{now}.jsonl")
+            try:
+                os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, 'a')
+            except OSError as e:
+                print(f"control trace 파일 생성 오류: {e}")
+                self.path = None
+
+    def record(self, **row):
+        row = {"time": timing.now(), **row}
+        self.history.append(row)
+        if self._file is not None:
+            self._file.write(json.dumps(row) + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ControlSummary:
+    """Tracks time-to-setpoint and overshoot of one get_duty run, plus its trace."""
+
+    def __init__(self, mode, target, threshold, trace_dir="./measurements"):
+        self.mode = mode
+        self.target = target
+        self.threshold = threshold
+        self.time_start = timing.monotonic()
+        self.time_to_setpoint = None
+        self.overshoot = 0.0
+        self.iterations = 0
+        self.trace = ControlTrace(mode, trace_dir)
+
+    def update(self, pressure, duty, duty_real):
+        self.trace.record(setpoint=self.target, pressure=pressure, duty=duty, duty_real=duty_real)
+        self.iterations += 1
+        if self.time_to_setpoint is None and abs(self.target - pressure) < self.threshold:
+            self.time_to_setpoint = timing.monotonic() - self.time_start
+        self.overshoot = max(self.overshoot, pressure - self.target)
+
+    def finish(self, success, duty, pressure):
+        global last_summary
+        last_summary = {"mode": self.mode,
+                        "target": self.target,
+                        "success": success,
+                        "duty": duty,
+                        "pressure": pressure,
+                        "iterations": self.iterations,
+                        "time to setpoint": self.time_to_setpoint,
+                        "overshoot": self.overshoot,
+                        "overshoot %": self.overshoot / self.target * 100,
+                        "total time": timing.monotonic() - self.time_start,
+                        "trace": self.trace.path}
+        self.trace.close()
+        print(f"[{self.mode}] time to setpoint: {self.time_to_setpoint}, "
+              f"overshoot: {self.overshoot:.2f} Pa, total: {last_summary['total time']:.1f}s")
+        return last_summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # finish() 없이 예외로 빠져나가도 trace 파일 닫기
+        self.trace.close()
+
+
+def model_duty(points, target):
+    '''
+    (제어 duty, 압력) 측정점으로 P = a·u^b 모델을 세워 target 압력의 duty 추정
+    target에 가장 가까운 두 점 사용, 추정 불가 시 None
+    '''
+    points = [(u, p) for u, p in points if u > 0 and p > 0]
+    points.sort(key=lambda point: abs(math.log(point[1] / target)))
+    for i, (u1, p1) in enumerate(points):
+        for u2, p2 in points[i + 1:]:
+            if u1 != u2 and p1 != p2:
+                b = math.log(p2 / p1) / math.log(u2 / u1)
+                if b > 0:
+                    return u1 * math.pow(target / p1, 1 / b)
+    return None
+
+
+def _next_duty(duty, estimate, current, target, control_limit, threshold):
+    # 한 번에 control_limit의 3배 이상 이동하지 않음
+    step = max(-3 * control_limit, min(3 * control_limit, estimate - duty))
+    new_duty = max(0, min(100, round(duty + step)))
+    if new_duty == duty and abs(target - current) >= threshold:
+        # 수렴 구간 밖에서 반올림으로 멈춘 경우 1씩 이동
+        new_duty = max(0, min(100, duty + (1 if current < target else -1)))
+    return new_duty
+
+
+def get_duty(target, delay, average_time, control_limit, duty_min=0, duty_max=100, test=True,
+             mode="pid", initial_duty=50, trace_dir="./measurements"):
     '''
     [2023-11-18]
     reversible fan 사용 시 pwm duty 
@@ -27,13 +146,22 @@ def get_duty(target, delay, average_time, control_limit, duty_min=0, duty_max=10
     55~90 까지 reverse (감압) 55가 min, 90이 max
     duty를 기반으로 pressure 제어 하는 코드를 실행하기 위해, duty 변환 함수를 사용해서 제어
     initial controlled duty = 0 → pwm-pressure PID control → duty result → function^-1(duty result) → real duty
+
+    mode="fast": initial_duty에서 시작하여 측정점으로 P = a·u^b 모델을 갱신하며
+    duty를 직접 추정 (모델 기울기에 따라 이득이 바뀌는 gain scheduling),
+    고정 delay 대신 압력 안정화 감지 후 측정
     '''
 
-    # 테스트 모드
-    if test: 
+    # 테스트 모드 (장치 backend가 설치된 경우 제어 수행)
+    if test and sensor_and_controller.get_backend() is None:
         return (duty_max, True, target)
+    if mode == "fast":
+        return get_duty_fast(target, delay, average_time, control_limit, duty_min, duty_max, test,
+                             initial_duty, trace_dir)
+    # 압력은 수집 스레드 버퍼에서 구간 평균으로 읽음
+    stream = acquisition.pressure_stream(test=test)
     # 현재 압력 값 측정 및 초기값 세팅
-    current = abs(sensor_and_controller.pressure_read(0.1, test=test))
+    current = abs(stream.recent(0.1))
     duty = 0
 
     # 압력 수렴 조건
@@ -41,8 +169,8 @@ def get_duty(target, delay, average_time, control_limit, duty_min=0, duty_max=10
     pressure_threshold = target/10
     duration = 10
     # duty 수렴 조건
-    window = []
     window_size = 50
+    window = deque(maxlen=window_size)
 
     # 실패 조건
     failure_time = 0
@@ -51,74 +179,235 @@ def get_duty(target, delay, average_time, control_limit, duty_min=0, duty_max=10
     # 종료 측정 조건
     final_measure_time = 5
 
+    # 제어 결과 요약
+    summary = ControlSummary("pid", target, pressure_threshold, trace_dir)
+
     # PID 컨트롤러 생성
     pid = PID(1, 0, 0, setpoint=target)
     pid.auto_mode = True
     pid.output_limits = (-control_limit, control_limit)
 
-    while True:
-        # 제어 시작 시간
-        time_start = time.time()
-        # PID 계산
-        control = pid(current)
-        # duty 업데이트 및 상하한 설정
-        duty += control
-        duty = round(duty)
-        duty = max(0, min(100, duty))
-        # PID 제어용 duty에서 실제 duty값으로 변경
-        duty_real = duty_transformation(duty, duty_min, duty_max)
-        # duty 값 적용
-        sensor_and_controller.duty_set(duty_real, test=False)
-        # 압력 변화 대기
-        time.sleep(delay)
-        # 압력 값 측정
-        current = abs(sensor_and_controller.pressure_read(average_time, test=test))
-        # duty의 이동 평균 계산
-        window.append(duty)
-        if len(window) > window_size:
-            window = window[1:]
-
-        duty_avg = sum(window)/len(window)
-
-        # 제어 종료 시간
-        time_diff = time.time() - time_start
-        # 압력 오차
-        error_pressure = abs(target - current)
-        # duty 오차 # 사용하지 않음
-        error_duty = abs(duty_avg - duty)
-        print(f"current pressure: {current:.2f}, error: {error_pressure:.2f}, target: {target}")
-
-        if error_pressure < pressure_threshold: # and error_duty < max(2, duty/10):
-            convergence_time += time_diff
-            print(f"Converging... ({convergence_time}s)")
-        else:
-            convergence_time = 0
-            print(f"Converging failed")
-        
-        if convergence_time >= duration:
-            current = abs(sensor_and_controller.pressure_read(final_measure_time, test=test))
-            print(f"Control finished with pressure({current}) for target({target})")
-            # 실제 duty값으로 변환 후 반환
+    # 예외로 제어가 끝나도 trace 파일 닫기
+    with summary:
+        while True:
+            # 제어 시작 시간
+            time_start = timing.monotonic()
+            # PID 계산
+            control = pid(current)
+            # duty 업데이트 및 상하한 설정
+            duty += control
+            duty = round(duty)
+            duty = max(0, min(100, duty))
+            # PID 제어용 duty에서 실제 duty값으로 변경
             duty_real = duty_transformation(duty, duty_min, duty_max)
-            return (duty_real, True, current)
-
-        # duty 100으로 설정해도 목표 압력에 도달하지 못하는 경우
-        if duty == 100 and error_pressure > failure_threshold:
-            print(
-                f"With duty=100, cannot reach the target pressure({target}), current pressure({current})"
-            )
-            failure_time += time_diff
-        elif duty == 0 and error_pressure > failure_threshold:
-            print(
-                f"At duty=0, current pressure({current}) exceed the target pressure ({target})"
-            )
-            failure_time += time_diff
-        else:
-            failure_time = 0
-
-        if failure_time >= duration:
-            current = abs(sensor_and_controller.pressure_read(final_measure_time, test=test))
-            print(f"Control failed.")
-            # 실제 duty값으로 변환 후 반환
+            # duty 값 적용
+            sensor_and_controller.duty_set(duty_real, test=False)
+            # 압력 변화 대기
+            stream.wait(delay)
+            # 압력 값 측정 (대기 구간 마지막 average_time 평균)
+            current = abs(stream.recent(average_time))
+            # duty의 이동 평균 계산
+            window.append(duty)
+
+            duty_avg = sum(window)/len(window)
+
+            # 제어 종료 시간
+            time_diff = timing.monotonic() - time_start
+            # 압력 오차
+            error_pressure = abs(target - current)
+            summary.update(current, duty, duty_real)
+            # duty 오차 # 사용하지 않음
+            error_duty = abs(duty_avg - duty)
+            print(f"current pressure: {current:.2f}, error: {error_pressure:.2f}, target: {target}")
+
+            if error_pressure < pressure_threshold: # and error_duty < max(2, duty/10):
+                convergence_time += time_diff
+                print(f"Converging... ({convergence_time}s)")
+            else:
+                convergence_time = 0
+                print(f"Converging failed")
+        
+            if convergence_time >= duration:
+                current = abs(stream.average(final_measure_time))
+                print(f"Control finished with pressure({current}) for target({target})")
+                # 실제 duty값으로 변환 후 반환
+                duty_real = duty_transformation(duty, duty_min, duty_max)
+                summary.finish(True, duty_real, current)
+                return (duty_real, True, current)
+
+            # duty 100으로 설정해도 목표 압력에 도달하지 못하는 경우
+            if duty == 100 and error_pressure > failure_threshold:
+                print(
+                    f"With duty=100, cannot reach the target pressure({target}), current pressure({current})"
+                )
+                failure_time += time_diff
+            elif duty == 0 and error_pressure > failure_threshold:
+                print(
+                    f"At duty=0, current pressure({current}) exceed the target pressure ({target})"
+                )
+                failure_time += time_diff
+            else:
+                failure_time = 0
+
+            if failure_time >= duration:
+                current = abs(stream.average(final_measure_time))
+                print(f"Control failed.")
+                # 실제 duty값으로 변환 후 반환
+                duty_real = duty_transformation(duty, duty_min, duty_max)
+                summary.finish(False, duty_real, current)
+                return (duty_real, False, current)
+
+
+def get_duty_fast(target, delay, average_time, control_limit, duty_min=0, duty_max=100, test=True,
+                  initial_duty=50, trace_dir="./measurements"):
+    # 압력 수렴 조건
+    convergence_time = 0
+    pressure_threshold = target/10
+    duration = 10
+    # 실패 조건
+    failure_time = 0
+    failure_threshold = 20
+    # 종료 측정 조건
+    final_measure_time = 5
+    # 측정 1회 전 최대 안정화 대기 시간
+    settle_timeout = 2 * delay
+
+    summary = ControlSummary("fast", target, pressure_threshold, trace_dir)
+    stream = acquisition.pressure_stream(test=test)
+    # (제어 duty, 압력) 측정점
+    points = []
+    # feed-forward 초기 duty
+    duty = max(0, min(100, round(initial_duty)))
+
+    # 예외로 제어가 끝나도 trace 파일 닫기
+    with summary:
+        while True:
+            # 제어 시작 시간
+            time_start = timing.monotonic()
+            # PID 제어용 duty에서 실제 duty값으로 변경 후 적용
             duty_real = duty_transformation(duty, duty_min, duty_max)
-            return (duty_real, False, current)
+            sensor_and_controller.duty_set(duty_real, test=False)
+            # 압력 안정화 대기 후 측정
+            acquisition.wait_for_settle(stream, timeout=settle_timeout)
+            current = abs(stream.recent(average_time))
+            points.append((duty, current))
+            summary.update(current, duty, duty_real)
+
+            # 제어 종료 시간
+            time_diff = timing.monotonic() - time_start
+            # 압력 오차
+            error_pressure = abs(target - current)
+            print(f"duty: {duty}, current pressure: {current:.2f}, error: {error_pressure:.2f}, target: {target}")
+
+            if error_pressure < pressure_threshold:
+                convergence_time += time_diff
+                print(f"Converging... ({convergence_time}s)")
+            else:
+                convergence_time = 0
+
+            if convergence_time >= duration:
+                current = abs(stream.average(final_measure_time))
+                print(f"Control finished with pressure({current}) for target({target})")
+                summary.finish(True, duty_real, current)
+                return (duty_real, True, current)
+
+            # duty 상/하한에서 목표 압력 도달 불가
+            if (duty == 100 and current < target or duty == 0 and current > target) \
+                    and error_pressure > failure_threshold:
+                failure_time += time_diff
+            else:
+                failure_time = 0
+
+            if failure_time >= duration:
+                current = abs(stream.average(final_measure_time))
+                print(f"Control failed.")
+                summary.finish(False, duty_real, current)
+                return (duty_real, False, current)
+
+        # 다음 duty: 모델 추정, 측정점이 부족하면 P ∝ u^1.5 가정
+        estimate = model_duty(points, target)
+        if estimate is None:
+            estimate = duty * math.pow(target / max(current, 1.0), 1 / 1.5) if duty else initial_duty
+        duty = _next_duty(duty, estimate, current, target, control_limit, pressure_threshold)
+
+
+def zone_flow(fan_curves, duty_ranges, fans):
+    # 구역 제어 duty(0~100) → 구역 팬 유량 합 (팬별 실제 duty 변환 후 보정 곡선)
+    def flow(duties):
+        return [sum(float(fan_curves[i].flow(duty_transformation(int(duty), *duty_ranges[i]))) for i in fans)
+                for duty in duties]
+    return flow
+
+
+def get_duties(test_rig, target, duty_ranges, fan_curves, delay=5, samples=10, control_limit=10,
+               initial_duty=50, hold=2, max_iterations=30, trace_dir="./measurements"):
+    '''
+    다중 팬 장비(rig.Rig) 구역별 동시 제어
+    구역마다 팬 보정 곡선 + 측정점으로 갱신되는 건물 모델 Q = C·ΔP^n
+    (schedule_planner.StationPlanner)로 목표 압력의 duty를 추정
+    매 반복마다 모든 팬 duty를 동시에 적용하고 (장치 I/O 스케줄러) 한 번 대기한 뒤
+    모든 측정점을 동시에 측정, 모든 구역이 hold회 연속 수렴하면 종료
+
+    duty_ranges, fan_curves: 팬별 (duty_min, duty_max), fan_curve.FanCurveSet
+    initial_duty: 구역별 제어 duty 또는 공통 값
+    반환: (팬별 실제 duty, 성공 여부, 측정점별 압력, 구역별 제어 duty)
+    '''
+    zones = test_rig.zones()
+    planners = [schedule_planner.StationPlanner(None, None, 0, 100,
+                                                flow=zone_flow(fan_curves, duty_ranges, fans))
+                for fans, _ in zones]
+    pressure_threshold = target/10
+    # 모든 구역이 duty 상/하한에서 목표 도달 불가한 반복 횟수
+    failure_limit = 3
+    failures = 0
+    converged = 0
+
+    summary = ControlSummary("multi", target, pressure_threshold, trace_dir)
+    if not isinstance(initial_duty, (list, tuple)):
+        initial_duty = [initial_duty] * len(zones)
+    duties = [max(0, min(100, round(duty))) for duty in initial_duty]
+    duties_real = []
+    applied = list(duties)
+    pressures = []
+
+    # 예외로 제어가 끝나도 trace 파일 닫기
+    with summary:
+        for _ in range(max_iterations):
+            # 구역 duty → 팬별 실제 duty, 동시 적용
+            duties_real = [0] * len(test_rig.fans)
+            for (fans, _), duty in zip(zones, duties):
+                for i in fans:
+                    duties_real[i] = duty_transformation(duty, *duty_ranges[i])
+            test_rig.set_duties(duties_real)
+            applied = list(duties)
+            timing.sleep(delay)
+            # 모든 측정점 동시 측정
+            pressures = [abs(p) if p is not None else 0.0 for p in test_rig.read_taps(samples)]
+            errors = [abs(target - pressures[tap]) for _, tap in zones]
+            summary.update(sum(pressures) / len(pressures), list(duties), list(duties_real))
+            print(f"duties: {duties_real}, pressures: {[round(p, 2) for p in pressures]}, target: {target}")
+
+            if max(errors) < pressure_threshold:
+                converged += 1
+                if converged >= hold:
+                    print(f"Control finished with pressures({pressures}) for target({target})")
+                    summary.finish(True, duties_real, pressures)
+                    return (duties_real, True, pressures, applied)
+            else:
+                converged = 0
+
+            # 모든 미수렴 구역이 duty 상/하한에서 더 이동할 수 없는 경우
+            saturated = [duty == 100 and pressures[tap] < target or duty == 0 and pressures[tap] > target
+                         for (_, tap), duty, error in zip(zones, duties, errors) if error >= pressure_threshold]
+            failures = failures + 1 if saturated and all(saturated) else 0
+            if failures >= failure_limit:
+                break
+
+            for z, (_, tap) in enumerate(zones):
+                planners[z].add(duties[z], pressures[tap])
+                duties[z] = _next_duty(duties[z], planners[z].duty_for(target), pressures[tap], target,
+                                       control_limit, pressure_threshold)
+
+        print(f"Control failed.")
+        summary.finish(False, duties_real, pressures)
+        return (duties_real, False, pressures, applied)
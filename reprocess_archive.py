@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import ACH_calculator
+import batch_calculator
+
+'''
+fan_coefficients.json 재보정 후 ./measurements 전체 재계산
+python reprocess_archive.py ./measurements --conditions ./conditions --workers 4 --chunk-size 32
+
+파일 단위 계산은 BlowerDoorTestCalculator 그대로 사용하고,
+묶음(chunk) 단위로 process pool에 분배하여 결과를 하나의 표로 합친다.
+'''
+
+# worker 프로세스별 팬 계수 (initializer에서 1회 로드)
+_registry = None
+
+
+def _init_worker(coefficients_path):
+    global _registry
+    _registry = ACH_calculator.fan_coefficient_registry(coefficients_path)
+    _registry.coefficients()
+
+
+def _to_row(measurement, conditions, calculator, val):
+    Q50s = calculator.volumetric_flow_rate()
+    return {
+        "measurement": measurement,
+        "conditions": conditions,
+        "test": calculator.measured_data.get("test", ""),
+        "fan_cover": calculator.cover,
+        "fan_count": calculator.num_fans,
+        "interior_volume": calculator.interior_volume,
+        "temperature": calculator.temperature,
+        "relative_humidity": calculator.relative_humidity,
+        "atmospheric_pressure": calculator.atmospheric_pressure,
+        "N": val["N"],
+        "n": val["n"],
+        "n_min": val["n range"][0],
+        "n_max": val["n range"][1],
+        "C": val["C"],
+        "C0": val["C0"],
+        "C0_min": val["C0 range"][0],
+        "C0_max": val["C0 range"][1],
+        "t": float(val["t"]),
+        "Q50": val["Q50"],
+        "Q50_min": Q50s[3],
+        "Q50_max": Q50s[4],
+        "ACH50": val["ACH50"],
+        "AL50": val["AL50"],
+        "r^2": val["r^2"],
+    }
+
+
+def process_chunk(pairs):
+    """Fit one chunk of (measurement, conditions) pairs; failures are returned, not raised."""
+    rows, failures = [], []
+    for measurement, conditions in pairs:
+        try:
+            calculator = ACH_calculator.BlowerDoorTestCalculator.from_file(measurement,
+                                                                         conditions,
+                                                                         _registry)
+            val = calculator.calculate_results()
+            rows.append(_to_row(measurement, conditions, calculator, val))
+        except Exception as e:
+            failures.append((measurement, f"{type(e).__name__}: {e}"))
+    return rows, failures
+
+
+def reprocess(pairs, workers=None, chunk_size=32, coefficients_path="fan_coefficients.json"):
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    rows, failures = [], []
+    time_start = time.time()
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(coefficients_path,)) as executor:
+        futures = [executor.submit(process_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            chunk_rows, chunk_failures = future.result()
+            rows += chunk_rows
+            failures += chunk_failures
+            # 진행률, 처리량
+            done = len(rows) + len(failures)
+            elapsed = time.time() - time_start
+            print(f"{done}/{len(pairs)} tests, {done / max(elapsed, 1e-9):.1f} tests/sec, "
+                  f"{len(failures)} failed")
+    # 입력 순서대로 정렬
+    order = {measurement: i for i, (measurement, _) in enumerate(pairs)}
+    rows.sort(key=lambda row: order[row["measurement"]])
+    results = {key: [row[key] for row in rows] for key in batch_calculator.COLUMNS}
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel reprocessing of the measurement archive")
+    parser.add_argument("measurements", nargs="?", default="./measurements",
+                        help="directory or glob of measurement json files")
+    parser.add_argument("--conditions", default="./conditions",
+                        help="directory or glob of conditions json files")
+    parser.add_argument("--coefficients", default="fan_coefficients.json",
+                        help="fan calibration file")
+    parser.add_argument("--output", default="./calculations/reprocessed.csv",
+                        help="output path (.csv or .json)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=32,
+                        help="tests per work unit")
+    args = parser.parse_args(argv)
+
+    pairs = batch_calculator.pair_files(args.measurements, args.conditions)
+    if not pairs:
+        print("No measurement/conditions pairs found.")
+        return 1
+    results, failures = reprocess(pairs, args.workers, args.chunk_size, args.coefficients)
+
+    for measurement, error in failures:
+        print(f"failed: {measurement} ({error})")
+    if args.output.endswith(".json"):
+        batch_calculator.write_columnar_json(results, args.output)
+    else:
+        batch_calculator.write_csv(results, args.output)
+    print(f"{len(results['measurement'])} tests → {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import os
+import json
+import io_scheduler
+import sensor_and_controller
+
+'''
+다중 팬 / 다중 압력 측정점 시험 장비 (rig.json)
+
+{
+    "fans": [
+        {"name": "door1", "pwm_pin": 18, "relay_pin": 23},
+        {"name": "door2", "modbus": {"port": "/dev/ttyUSB2", "slave": 2, "register": 0}, "cover": "low"}
+    ],
+    "pressure_taps": [
+        {"name": "zone1", "slave": 1},
+        {"name": "zone2", "slave": 2, "port": "/dev/ttyUSB0"}
+    ]
+}
+
+팬 수와 측정점 수가 같으면 팬 i는 측정점 i의 압력으로 제어하고 (구역별 제어),
+측정점이 1개이면 모든 팬을 같은 duty로 제어한다.
+팬 "cover"가 없으면 시험 조건의 fan_cover를 사용한다.
+rig.json이 없으면 기존 단일 팬(GPIO 18) + 단일 센서 시험.
+
+팬과 측정점은 장치 I/O 스케줄러의 개별 장치로 등록되어 동시에 명령/측정된다.
+(같은 RS-485 포트의 측정점은 같은 장치로 순차 처리)
+'''
+
+
+class FanChannel:
+    """One independently addressed fan: a duty/power driver plus its calibration cover."""
+
+    def __init__(self, name, driver, cover="none"):
+        self.name = name
+        self.driver = driver
+        self.cover = cover
+        self.device = f"fan:{name}"
+
+    def set_duty(self, duty):
+        self.driver.set_duty(max(0, min(100, int(duty))))
+
+    def set_power(self, on):
+        self.driver.set_power(on)
+
+    def close(self):
+        self.driver.close()
+
+
+class PressureTap:
+    """One pressure reference; `read_sample` returns Pa or None."""
+
+    def __init__(self, name, read_sample, device="pressure"):
+        self.name = name
+        self.read_sample = read_sample
+        self.device = device
+
+    def read_average(self, samples=10):
+        values = [value for value in (self.read_sample() for _ in range(samples)) if value is not None]
+        return sum(values) / len(values) if values else None
+
+
+def modbus_tap(name, port='/dev/ttyUSB0', baudrate=9600, slave=1, register=1):
+    # Lefoo 차압 센서, 같은 포트의 센서는 slave 주소로 구분
+    session = sensor_and_controller.sensor_session(port, baudrate)
+
+    def read_sample():
+        return sensor_and_controller.lefoo_read(session, slave, register)
+
+    device = "pressure" if port == '/dev/ttyUSB0' else f"pressure:{port}"
+    return PressureTap(name, read_sample, device)
+
+
+def hardware_fan(config, index, cover="none"):
+    name = config.get("name", f"fan{index + 1}")
+    if "modbus" in config:
+        driver = sensor_and_controller.ModbusFanDrive(**config["modbus"])
+    else:
+        driver = sensor_and_controller.FanController(pwm_pin=config.get("pwm_pin"),
+                                                     relay_pin=config.get("relay_pin"))
+    return FanChannel(name, driver, config.get("cover", cover).lower())
+
+
+class Rig:
+    """Fans and pressure taps of one multi-fan test, driven concurrently through the I/O scheduler."""
+
+    def __init__(self, fans, taps):
+        if not fans or not taps:
+            raise ValueError("rig needs at least one fan and one pressure tap")
+        if len(taps) not in (1, len(fans)):
+            raise ValueError(f"{len(fans)} fans need 1 or {len(fans)} pressure taps, got {len(taps)}")
+        self.fans = fans
+        self.taps = taps
+
+    def zones(self):
+        # [(팬 index 목록, 측정점 index)], 측정점 1개면 모든 팬이 한 구역
+        if len(self.taps) == 1:
+            return [(list(range(len(self.fans))), 0)]
+        return [([i], i) for i in range(len(self.fans))]
+
+    def set_duties(self, duties):
+        io_scheduler.get_scheduler().call_all(
+            [(fan.device, fan.set_duty, (duty,), io_scheduler.COMMAND) for fan, duty in zip(self.fans, duties)])
+
+    def set_power(self, on):
+        io_scheduler.get_scheduler().call_all(
+            [(fan.device, fan.set_power, (on,), io_scheduler.COMMAND) for fan in self.fans])
+
+    def read_taps(self, samples=10):
+        # 측정점별 samples회 평균 (Pa), 포트가 다른 측정점은 동시에 측정
+        return io_scheduler.get_scheduler().call_all(
+            [(tap.device, tap.read_average, (samples,), io_scheduler.READ) for tap in self.taps])
+
+    def describe(self):
+        # 측정 JSON 기록용 (ACH_calculator는 "fans"의 커버로 팬별 풍량 계산)
+        return {"fans": [{"name": fan.name, "cover": fan.cover} for fan in self.fans],
+                "pressure_taps": [tap.name for tap in self.taps]}
+
+    def close(self):
+        for fan in self.fans:
+            fan.close()
+
+
+# 설치된 장비 (가상 장비 등), None이면 rig.json 사용
+_rig = None
+
+
+def set_rig(rig):
+    global _rig
+    _rig = rig
+
+
+def load_rig(path="rig.json", cover="none"):
+    """Installed rig, else the rig described by `path`, else None (single-fan test)."""
+    if _rig is not None:
+        return _rig
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as file:
+        config = json.load(file)
+    fans = [hardware_fan(fan, i, cover) for i, fan in enumerate(config["fans"])]
+    taps = [modbus_tap(tap.get("name", f"tap{i + 1}"),
+                       tap.get("port", '/dev/ttyUSB0'),
+                       tap.get("baudrate", 9600),
+                       tap.get("slave", i + 1),
+                       tap.get("register", 1))
+            for i, tap in enumerate(config["pressure_taps"])]
+    return Rig(fans, taps)
@@ -0,0 +1,118 @@
+import math
+import numpy as np
+import ACH_calculator
+
+'''
+측정점 계획 (ln ΔP 등간격)
+
+planner = schedule_planner.StationPlanner(fan_curve, fan_count, duty_low=19, duty_high=100)
+planner.add(duty, pressure)                # 측정점 추가 → 건물 모델 Q = C·ΔP^n 갱신
+targets = planner.targets(10)              # 목표 압력 (높은 압력부터, 첫 값은 최고 측정 압력)
+plan = planner.plan(10)                    # targets[1:] 중 예측 duty가 서로 다른 목표만
+duty = planner.duty_for(targets[1])        # 목표 압력의 예상 duty
+planner.missed(targets[1], pressure)       # 측정 압력이 목표 간격 이상 벗어났는지 (이웃 측정점과 겹침)
+
+팬 유량은 fan_coefficients.json 보정 곡선(fan_curve.FanCurveSet)을 사용하고,
+건물 모델은 지금까지의 측정점으로 매번 다시 회귀한다.
+팬 여러 대의 합 등 다른 duty → 유량 관계는 flow 함수로 지정:
+StationPlanner(None, None, 0, 100, flow=lambda duty: ...)
+'''
+
+
+def log_spaced_pressures(high, low, count):
+    # high → low, ln(ΔP) 등간격
+    return [float(p) for p in np.exp(np.linspace(math.log(high), math.log(low), count))]
+
+
+class StationPlanner:
+    """Predicts the fan duty of each pressure station from the fan curve and a house
+    model Q = C·ΔP^n fitted to the stations measured so far."""
+
+    # 측정점이 1개일 때 가정하는 유량 지수, 예측에 사용하는 n 범위
+    default_n = 0.65
+    n_limits = (0.5, 1.0)
+
+    def __init__(self, fan_curve, fan_count, duty_low, duty_high, p_min=10.0, tolerance=0.1, flow=None):
+        self.p_min = p_min
+        # 재측정 판정 최소 허용 오차 (ln ΔP, 바람 변동 대비)
+        self.tolerance = tolerance
+        self.duty_low = int(min(duty_low, duty_high))
+        self.duty_high = int(max(duty_low, duty_high))
+        # duty → 유량 (㎥/h), 배열 입력
+        self.flow = flow or (lambda duty: fan_curve.flow(duty, fan_count))
+        # 정수 duty별 팬 유량 표 (유량 순 정렬, 역함수 보간용)
+        duties = np.arange(self.duty_low, self.duty_high + 1)
+        flows = np.asarray(self.flow(duties), dtype=float)
+        order = np.argsort(flows)
+        self.duties = duties[order]
+        self.flows = flows[order]
+        self.points = []
+        self.log_step = None
+
+    def add(self, duty, pressure):
+        pressure = abs(pressure)
+        if pressure > 0:
+            self.points.append((duty, pressure))
+
+    def model(self):
+        # (C, n), 측정점이 없으면 None
+        if not self.points:
+            return None
+        duties, pressures = np.asarray(self.points, dtype=float).T
+        flows = np.asarray(self.flow(duties), dtype=float)
+        n = self.default_n
+        if len(set(pressures)) >= 2:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fit = ACH_calculator.fit_power_law(pressures, flows)
+            if np.isfinite(fit["n"]):
+                n = float(fit["n"])
+        n = min(max(n, self.n_limits[0]), self.n_limits[1])
+        # n 고정 후 ln(C) = mean(ln Q - n·ln ΔP)
+        C = float(np.exp(np.mean(np.log(flows) - n * np.log(pressures))))
+        return C, n
+
+    def pressure_at(self, duty):
+        C, n = self.model()
+        flow = float(np.asarray(self.flow(np.atleast_1d(duty)), dtype=float)[0])
+        return math.pow(max(flow, 0.0) / C, 1 / n)
+
+    def duty_for(self, pressure):
+        C, n = self.model()
+        flow = C * math.pow(pressure, n)
+        # 보정 범위 밖은 duty 상/하한으로 제한
+        return int(round(float(np.interp(flow, self.flows, self.duties))))
+
+    def reachable(self):
+        # 팬 duty 범위로 만들 수 있는 (최저, 최고) 압력 예측
+        return tuple(sorted((self.pressure_at(self.duty_low), self.pressure_at(self.duty_high))))
+
+    def targets(self, count):
+        lowest, highest = self.reachable()
+        # 목표 범위를 팬 duty 범위로 만들 수 있는 압력으로 제한
+        high = min(max(p for _, p in self.points), highest)
+        # 최저 압력은 p_min 이상, 팬 최소 유량으로 만들 수 있는 압력 이상
+        low = max(self.p_min, lowest)
+        if low >= high:
+            low = min(lowest, high)
+        if low >= high:
+            self.log_step = 0.0
+            return [high] * count
+        self.log_step = (math.log(high) - math.log(low)) / (count - 1)
+        return log_spaced_pressures(high, low, count)
+
+    def plan(self, count):
+        """targets(count) below the highest station, without targets whose predicted
+        (whole) duty repeats the previous one."""
+        previous = max(self.points, key=lambda point: point[1])[0]
+        plan = []
+        for target in self.targets(count)[1:]:
+            duty = self.duty_for(target)
+            if duty != previous:
+                plan.append(target)
+                previous = duty
+        return plan
+
+    def missed(self, target, pressure):
+        if not self.log_step or pressure <= 0:
+            return False
+        return abs(math.log(abs(pressure) / target)) > max(self.log_step, self.tolerance)
@@ -1,65 +1,320 @@
 import re
 import serial
-import crcmod
-import struct
 import time
+import atexit
+import threading
 import pigpio
+import modbus_rtu
+import io_scheduler
+import timing
 
 
+class SensorSession:
+    """Long-lived serial port shared by the GUI thread and BackgroundTask threads.
 
-def temperature_and_humidity(port='/dev/ttyUSB1', baudrate=9600):
-    # 시리얼 연결
-    ser = serial.Serial(port=port,
-                        baudrate=baudrate,
-                        timeout=1)
-    return ser
+    Each request/response pair runs under one lock. On a serial error the port
+    is closed and reopened on the next transaction.
+    """
+
+    def __init__(self, port='/dev/ttyUSB0', baudrate=9600, timeout=1, reconnect_delay=0.5):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self._serial = None
+        self._lock = threading.RLock()
+
+    def open(self):
+        with self._lock:
+            if self._serial is None or not self._serial.is_open:
+                self._serial = serial.Serial(port=self.port,
+                                             baudrate=self.baudrate,
+                                             timeout=self.timeout)
+            return self._serial
+
+    def close(self):
+        with self._lock:
+            if self._serial is not None:
+                try:
+                    self._serial.close()
+                except (serial.SerialException, OSError):
+                    pass
+                self._serial = None
+
+    def transact(self, request, response_size):
+        # 요청 송신 후 응답 수신, 실패 시 포트 재연결 후 빈 응답 반환
+        with self._lock:
+            try:
+                ser = self.open()
+                # 이전 응답 잔여 바이트 제거 (프레임 동기화)
+                ser.reset_input_buffer()
+                ser.write(request)
+                return ser.read(response_size)
+            except (serial.SerialException, OSError) as e:
+                print(f"serial error on {self.port}: {e}, reconnecting")
+                self.close()
+                time.sleep(self.reconnect_delay)
+                return b''
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# 포트별 공유 세션
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def sensor_session(port='/dev/ttyUSB0', baudrate=9600):
+    with _sessions_lock:
+        if port not in _sessions:
+            _sessions[port] = SensorSession(port, baudrate)
+        return _sessions[port]
+
+
+@atexit.register
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+
+
+# 장치 backend (devices.DeviceBackend), None이면 기존 하드웨어/테스트 동작
+_backend = None
+
+
+def set_backend(backend):
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+def device_call(device, fn, *args, priority=io_scheduler.READ):
+    # 장치("pressure", "environment", "fan")별 I/O 스레드에서 실행, 결과 대기
+    return io_scheduler.get_scheduler().call(device, fn, *args, priority=priority)
+
+
+def lefoo_read(session, slave=1, register=1):
+    """One Lefoo differential pressure reading (Pa) over `session`, None on a bad frame."""
+    response = session.transact(modbus_rtu.read_request(slave, register), modbus_rtu.response_size(1))
+    # 데이터 분해 (CRC 등 오류 프레임은 버림)
+    values = modbus_rtu.parse_read_response(response, slave)
+    # 소수점 1자리까지 값을 반환하므로 10으로 나눔
+    return None if values is None else values[0] / 10
+
+
+def _backend_pressure(average_time):
+    # backend 샘플을 average_time 동안 평균
+    time_start = timing.monotonic()
+    average = []
+    while True:
+        value = device_call("pressure", _backend.read_pressure)
+        if value is not None:
+            average.append(value)
+        if timing.monotonic() - time_start >= average_time and len(average):
+            return sum(average) / len(average)
+
+
+class FanController:
+    """One long-lived pigpio connection for the fan PWM and power relay.
+
+    The last applied duty is cached so repeated writes of the same value are
+    skipped. Duty is forced to 0 on close(), on leaving a `with` block
+    (including by exception) and at interpreter exit.
+    """
+
+    # Define the GPIO pin for PWM and the frequency in Hertz (1kHz)
+    pwm_pin = 18
+    frequency = 1000
+    # Define the GPIO pin for power relay for the Fan
+    relay_pin = 23
+
+    def __init__(self, pi_factory=None, pwm_pin=None, relay_pin=None):
+        self.pi_factory = pi_factory or pigpio.pi
+        # 다중 팬 장비는 팬마다 핀 지정 (hardware PWM: GPIO 12/13/18/19)
+        if pwm_pin is not None:
+            self.pwm_pin = pwm_pin
+        if relay_pin is not None:
+            self.relay_pin = relay_pin
+        self._pi = None
+        self.duty = None
+        self._lock = threading.RLock()
+
+    def _connection(self):
+        if self._pi is None or not self._pi.connected:
+            self._pi = self.pi_factory()
+            # 재연결 시 실제 출력 상태를 알 수 없으므로 캐시 초기화
+            self.duty = None
+            if not self._pi.connected:
+                self._pi = None
+                raise ConnectionError("pigpio daemon에 연결할 수 없습니다.")
+        return self._pi
+
+    def set_duty(self, duty):
+        with self._lock:
+            # 연결이 끊긴 뒤에는 캐시를 믿지 않고 다시 기록
+            if duty == self.duty and self._pi is not None and self._pi.connected:
+                return
+            try:
+                # The range of duty cycle is from 0 to 1,000,000 (representing 0% to 100%)
+                self._connection().hardware_PWM(self.pwm_pin, self.frequency, int(duty) * 10_000)
+            except Exception:
+                # 기록 실패 시 실제 출력 상태를 알 수 없으므로 캐시 초기화
+                self.duty = None
+                raise
+            self.duty = duty
+
+    def set_power(self, on):
+        with self._lock:
+            self._connection().write(self.relay_pin, on)
+
+    def close(self):
+        # 종료 시 duty 0 보장
+        with self._lock:
+            if self._pi is None:
+                return
+            try:
+                self._pi.hardware_PWM(self.pwm_pin, self.frequency, 0)
+            finally:
+                self._pi.stop()
+                self._pi = None
+                self.duty = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ModbusFanDrive:
+    """Fan drive (EC controller / VFD) taking its duty as a Modbus RTU holding register."""
+
+    def __init__(self, port='/dev/ttyUSB2', baudrate=9600, slave=1, register=0, scale=10,
+                 run_register=None):
+        self.session = sensor_session(port, baudrate)
+        self.slave = slave
+        self.register = register
+        # duty(%) × scale → 레지스터 값 (기본 0.1 % 단위)
+        self.scale = scale
+        # 운전/정지 레지스터 (없으면 set_power 무시)
+        self.run_register = run_register
+        self.duty = None
+
+    def _write(self, register, value):
+        request = modbus_rtu.write_request(self.slave, register, int(value))
+        if self.session.transact(request, modbus_rtu.WRITE_RESPONSE_SIZE) != request:
+            raise IOError(f"fan drive {self.session.port}#{self.slave} did not acknowledge register {register}")
+
+    def set_duty(self, duty):
+        if duty == self.duty:
+            return
+        self._write(self.register, round(duty * self.scale))
+        self.duty = duty
+
+    def set_power(self, on):
+        if self.run_register is not None:
+            self._write(self.run_register, 1 if on else 0)
+
+    def close(self):
+        # 종료 시 duty 0 (응답 실패는 무시)
+        try:
+            self._write(self.register, 0)
+        except IOError as e:
+            print(e)
+        self.duty = None
+
+
+_fan_controller = None
+_fan_controller_lock = threading.Lock()
+
+
+def fan_controller():
+    global _fan_controller
+    with _fan_controller_lock:
+        if _fan_controller is None:
+            _fan_controller = FanController()
+        return _fan_controller
+
+
+@atexit.register
+def close_fan_controller():
+    if _fan_controller is not None:
+        _fan_controller.close()
+
+
+# 온습도/대기압 센서 (Modbus RTU) 레지스터 배치: 이름 → (시작 레지스터부터의 순서, 배율)
+ENVIRONMENT_REGISTERS = {
+    "relative_humidity": (0, 0.1),      # %RH × 10
+    "temperature": (1, 0.1),            # ℃ × 10
+    "atmospheric_pressure": (2, 10),    # hPa × 10 → Pa
+}
+# 센서가 없거나 응답이 없을 때 사용하는 표준 조건
+ENVIRONMENT_DEFAULTS = {"temperature": 20, "relative_humidity": 50, "atmospheric_pressure": 101325}
+
+
+def modbus_environment(port='/dev/ttyUSB1', baudrate=9600, slave=1, register=0):
+    # 온습도/대기압 1회 읽기, 오류 프레임은 None
+    count = len(ENVIRONMENT_REGISTERS)
+    response = sensor_session(port, baudrate).transact(modbus_rtu.read_request(slave, register, count),
+                                                       modbus_rtu.response_size(count))
+    values = modbus_rtu.parse_read_response(response, slave, count)
+    if values is None:
+        return None
+    return {name: values[i] * scale for name, (i, scale) in ENVIRONMENT_REGISTERS.items()}
+
+
+def environment_read(port='/dev/ttyUSB1', baudrate=9600, test=True):
+    """One {"temperature", "relative_humidity", "atmospheric_pressure"} reading, or None."""
+    # 장치 backend 사용
+    if _backend is not None:
+        return device_call("environment", _backend.read_environment)
+    # 테스트 모드
+    if test:
+        return dict(ENVIRONMENT_DEFAULTS)
+    return device_call("environment", modbus_environment, port, baudrate)
 
 
 def pressure_read(average_time=0.1, port='/dev/ttyUSB0', baudrate=9600, test=True):
+    # 장치 backend 사용
+    if _backend is not None:
+        return _backend_pressure(average_time)
     # 테스트 모드
     if test:
         import random
         return random.randrange(0, 100)
-    # 시리얼 연결
-    ser = serial.Serial(port=port,
-                        baudrate=baudrate,
-                        timeout=1)
+    # 시리얼 연결 (포트 공유 세션 재사용)
+    session = sensor_session(port, baudrate)
     # 측정 시작 시간
-    time_start = time.time()
+    time_start = timing.monotonic()
     # 평균 값을 위한 변수 선언
     average = []
-    # 데이터 요청 값
-    data = b'\x01\x03\x00\x01\x00\x01'
-    # 모드버스 통신을 위한 CRC 계산
-    crc16 = crcmod.predefined.Crc('modbus')
-    crc16.update(data)
-    crc_bytes = crc16.digest()
-    crc_bytes_reversed = crc_bytes[::-1]
-    # 데이터 요청 값 + CRC
-    data += crc_bytes_reversed
     # 반복 측정
     while True:
-        # 데이터 송신
-        ser.write(data)
-        # 데이터 수신
-        response = ser.read(7)
-        try:
-            # 데이터 분해
-            _, _, _, value, _ = struct.unpack('>BBBhH', response)
+        # 데이터 송수신 (slave 1, register 1)
+        value = device_call("pressure", lefoo_read, session)
+        if value is not None:
             # 데이터 축적
             average.append(value)
-        except struct.error:
-            pass
 
         # 데이터 평균값 계산
-        if time.time() - time_start >= average_time and len(average):
-            ser.close()
-            average_pressure = sum(average) / len(average)
-            # 소수점 1자리까지 값을 반환하는 Lefoo 압력 센서이므로
-            # 결과값을 10으로 나눈 값으로 반환
-            return average_pressure/10
+        if timing.monotonic() - time_start >= average_time and len(average):
+            return sum(average) / len(average)
 
 def duty_set(duty, test=True):
+    # 장치 backend 사용
+    if _backend is not None:
+        device_call("fan", _backend.set_duty, max(0, min(100, int(duty))), priority=io_scheduler.COMMAND)
+        return 0
     # 테스트 모드
     if test:
         return 0
@@ -80,36 +335,18 @@ def duty_set(duty, test=True):
     except ValueError:
         duty = '50'
         
-    # Connect to pigpio
-    pi = pigpio.pi()
-
-    # Define the GPIO pin for PWM and the frequency in Hertz (1kHz)
-    gpio_pin = 18  # Example GPIO pin
-    frequency = 1000  # 1kHz
-
-    # Set the hardware PWM
-    # The range of duty cycle is from 0 to 1,000,000 (representing 0% to 100%)
-    duty_cycle = int(duty) * 10_000  # 50% duty cycle as an example
-
-    # Initialize the PWM on the specified pin
-    pi.hardware_PWM(gpio_pin, frequency, duty_cycle)
-
-    # Disconnect from pigpio
-    pi.stop()
+    # 공유 pigpio 연결로 duty 적용 (같은 값이면 생략)
+    device_call("fan", fan_controller().set_duty, int(duty), priority=io_scheduler.COMMAND)
     return 0
 
 
 def fan_power(set=1):
-    # Connect to pigpio
-    pi = pigpio.pi()
-    
-    # Define the GPIO pin for power relay for the Fan
-    gpio_pin = 23
+    # 장치 backend 사용
+    if _backend is not None:
+        device_call("fan", _backend.set_power, set, priority=io_scheduler.COMMAND)
+        return 0
     # To set the relay
-    pi.write(gpio_pin, set)
-
-    # Disconnect from pigpio
-    pi.stop()
+    device_call("fan", fan_controller().set_power, set, priority=io_scheduler.COMMAND)
     return 0
 
 
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import timing
+import rig
+import devices
+import acquisition
+import sensor_and_controller
+import ACH_calculator
+
+'''
+가상 장비 + 가상 시계로 BackgroundTask.blower_door_test 전체 흐름 실행
+python simulate_test.py --test depressurization --C 200 --n 0.65 --workdir ./simulation
+
+--zones N: 구역 N개 (건물 C를 N등분), 구역마다 팬 1대 + 압력 측정점 1개인 다중 팬 장비
+
+측정 파일은 workdir 아래 (conditions.json, measurements/, {test}_raw.json)에 저장되며,
+실제 시험 시간과 관계없이 수 초 이내에 종료된다.
+'''
+
+
+def run_simulation(test="depressurization", C=200.0, n=0.65, cover="none", fan_count=2,
+                   interior_volume=400.0, noise_pa=0.3, gust_pa=1.0, lag=2.0, seed=None, workdir=None,
+                   zones=0):
+    # BackgroundTask는 PyQt6가 필요하므로 실행 시점에 불러옴
+    import user_interface
+
+    workdir = workdir or tempfile.mkdtemp(prefix="blower_door_sim_")
+    os.makedirs(os.path.join(workdir, "measurements"), exist_ok=True)
+    conditions = {"interior volume": str(interior_volume),
+                  "fan_cover": cover,
+                  "fan_count": fan_count,
+                  test: True}
+    with open(os.path.join(workdir, "conditions.json"), "w") as file:
+        json.dump(conditions, file, indent=4)
+
+    clock = timing.VirtualClock()
+    previous_clock = timing.get_clock()
+    timing.set_clock(clock)
+    house = devices.SimulatedHouse(C=C, n=n, lag=lag, gust_pa=gust_pa, seed=seed)
+    sensor_and_controller.set_backend(
+        devices.SimulatedBackend(house, cover=cover, fan_count=fan_count, noise_pa=noise_pa, seed=seed))
+    if zones:
+        houses = [devices.SimulatedHouse(C=C / zones, n=n, lag=lag, gust_pa=gust_pa,
+                                         seed=None if seed is None else seed + i)
+                  for i in range(zones)]
+        rig.set_rig(devices.SimulatedZones(houses, [cover] * zones, noise_pa=noise_pa, seed=seed).rig())
+    cwd = os.getcwd()
+    wall_start = time.perf_counter()
+    try:
+        os.chdir(workdir)
+        user_interface.BackgroundTask(test).blower_door_test(test)
+        calculator = ACH_calculator.BlowerDoorTestCalculator.from_file(f"{test}_raw.json", "conditions.json")
+        results = calculator.calculate_results()
+    finally:
+        os.chdir(cwd)
+        acquisition.stop_streams()
+        rig.set_rig(None)
+        sensor_and_controller.set_backend(None)
+        timing.set_clock(previous_clock)
+
+    return {"workdir": workdir,
+            "simulated seconds": clock.monotonic(),
+            "wall seconds": time.perf_counter() - wall_start,
+            "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a blower door test against the simulated rig")
+    parser.add_argument("--test", default="depressurization", choices=["depressurization", "pressurization"])
+    parser.add_argument("--C", type=float, default=200.0, help="house flow coefficient (㎥/h/Pa^n)")
+    parser.add_argument("--n", type=float, default=0.65, help="house flow exponent")
+    parser.add_argument("--cover", default="none")
+    parser.add_argument("--fan-count", type=int, default=2)
+    parser.add_argument("--volume", type=float, default=400.0, help="interior volume (㎥)")
+    parser.add_argument("--noise", type=float, default=0.3, help="sensor noise (Pa)")
+    parser.add_argument("--gust", type=float, default=1.0, help="wind gust amplitude (Pa)")
+    parser.add_argument("--lag", type=float, default=2.0, help="pressure lag time constant (s)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--zones", type=int, default=0, help="multi-fan rig with one fan and tap per zone")
+    args = parser.parse_args(argv)
+
+    run = run_simulation(args.test, args.C, args.n, args.cover, args.fan_count, args.volume,
+                         args.noise, args.gust, args.lag, args.seed, args.workdir, args.zones)
+    results = run["results"]
+    print(f"simulated {run['simulated seconds']:.0f} s in {run['wall seconds']:.2f} s ({run['workdir']})")
+    print(f"C0={results['C0']:.1f} n={results['n']:.3f} Q50={results['Q50']:.1f} ACH50={results['ACH50']:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# 저장소 최상위 모듈 (ACH_calculator, acquisition, ...) 불러오기
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pigpio는 라즈베리 파이에만 설치되므로 없으면 fake_pigpio 사용
+try:
+    import pigpio
+except ImportError:
+    import fake_pigpio
+    sys.modules["pigpio"] = fake_pigpio
@@ -0,0 +1,57 @@
+import math
+import numpy as np
+import pytest
+from scipy import stats
+import ACH_calculator
+from fan_curve import FanCurveSet
+
+# 감압 시험 측정점 (ΔP, duty)
+STATIONS = [[61.6, 55], [56.7, 45], [53.2, 41], [50.0, 38], [47.4, 32], [45.2, 28], [43.2, 24], [41.2, 20]]
+
+
+def test_fit_power_law_matches_scipy():
+    pressures = np.array([10.0, 20.0, 30.0, 45.0, 60.0])
+    flows = 150 * pressures ** 0.63 * np.array([1.02, 0.97, 1.01, 0.99, 1.01])
+    fit = ACH_calculator.fit_power_law(pressures, flows)
+    reference = stats.linregress(np.log(pressures), np.log(flows))
+    assert fit["N"] == 5
+    assert fit["n"] == pytest.approx(reference.slope)
+    assert np.log(fit["C"]) == pytest.approx(reference.intercept)
+    assert fit["variance of n"] == pytest.approx(reference.stderr)
+    assert fit["variance of ln(C)"] == pytest.approx(reference.intercept_stderr)
+    assert fit["r^2 of ln"] == pytest.approx(reference.rvalue ** 2)
+
+
+def test_fit_power_law_rows_ignore_nan_padding():
+    pressures = np.array([[10.0, 20.0, 40.0, 60.0], [15.0, 30.0, 50.0, np.nan]])
+    flows = np.array([[300.0, 460.0, 700.0, 880.0], [350.0, 540.0, 760.0, np.nan]])
+    fit = ACH_calculator.fit_power_law(pressures, flows)
+    for row in range(2):
+        single = ACH_calculator.fit_power_law(pressures[row][:4 - row], flows[row][:4 - row])
+        assert fit["N"][row] == single["N"]
+        assert fit["n"][row] == pytest.approx(single["n"])
+        assert fit["C"][row] == pytest.approx(single["C"])
+
+
+@pytest.mark.parametrize("alpha", [0.025, 0.05])
+@pytest.mark.parametrize("dof", [1, 2, 8, 20, 35])
+def test_t_quantile_matches_scipy(alpha, dof):
+    assert ACH_calculator.t_quantile(alpha, dof) == pytest.approx(stats.t.ppf(1 - alpha, dof))
+
+
+def test_online_fit_matches_batch_fit():
+    curve = FanCurveSet.from_config(ACH_calculator.DEFAULT_COEFFICIENTS["none"])
+    conditions = {"temperature": 18.0, "relative_humidity": 45.0, "atmospheric_pressure": 100800.0}
+    online = ACH_calculator.OnlineFit(400.0, curve, 2, **conditions)
+    for row in STATIONS:
+        online.add(row)
+    live = online.results()
+
+    calculator = ACH_calculator.BlowerDoorTestCalculator(
+        {"interior volume": "400", "fan_cover": "none", "fan_count": 2, "measured_value": STATIONS, **conditions})
+    results = calculator.calculate_results()
+    assert live["N"] == len(STATIONS)
+    for key in ["n", "C0", "Q50", "ACH50"]:
+        assert live[key] == pytest.approx(results[key], rel=1e-9)
+    assert live["n range"] == pytest.approx(results["n range"], rel=1e-9)
+    assert live["C0 range"] == pytest.approx(results["C0 range"], rel=1e-9)
@@ -0,0 +1,36 @@
+import numpy as np
+from acquisition import RingBuffer
+
+
+def test_ring_buffer_before_wraparound():
+    buffer = RingBuffer(5)
+    for t in range(3):
+        buffer.append(t, t * 10)
+    times, values = buffer.window()
+    np.testing.assert_array_equal(times, [0, 1, 2])
+    np.testing.assert_array_equal(values, [0, 10, 20])
+    assert buffer.oldest() == (0, 0)
+
+
+def test_ring_buffer_wraparound():
+    buffer = RingBuffer(5)
+    for t in range(12):
+        buffer.append(t, t * 10)
+    assert len(buffer) == 5
+    assert buffer.latest() == (11, 110)
+    assert buffer.oldest() == (7, 70)
+    times, values = buffer.window()
+    np.testing.assert_array_equal(times, [7, 8, 9, 10, 11])
+    np.testing.assert_array_equal(values, [70, 80, 90, 100, 110])
+
+
+def test_ring_buffer_window_across_wraparound():
+    buffer = RingBuffer(5)
+    for t in range(12):
+        buffer.append(t, t)
+    # 시작 위치가 앞 구간 [head:] 또는 최근 구간 [:head]에 있는 경우
+    for seconds in range(7):
+        times, _ = buffer.window(seconds)
+        np.testing.assert_array_equal(times, np.arange(max(7, 11 - seconds), 12))
+    times, _ = buffer.window(2, now=10)
+    np.testing.assert_array_equal(times, [8, 9, 10, 11])
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from fan_curve import FanCurve, FanCurveSet
+
+
+def test_table_interpolation():
+    # 정렬되지 않은 표도 duty 순으로 보간
+    curve = FanCurve(table=[[60, 1400], [20, 600], [100, 1900]])
+    assert curve(40) == pytest.approx(1000)
+    assert curve(80) == pytest.approx(1650)
+    np.testing.assert_allclose(curve([20, 60, 100]), [600, 1400, 1900])
+    # 양 끝은 끝 구간으로 외삽
+    assert curve(10) == pytest.approx(400)
+    assert curve(110) == pytest.approx(2025)
+
+
+def test_linear_and_polynomial():
+    assert FanCurve.from_config({"slope": 10, "intercept": 900})(50) == pytest.approx(1400)
+    assert FanCurve.from_config({"polynomial": [1, 2, 3]})(2) == pytest.approx(17)
+
+
+@pytest.mark.parametrize("table", [[[50, 1000]], [[50, 1000], [50, 1100]], [1, 2]])
+def test_invalid_table(table):
+    with pytest.raises(ValueError):
+        FanCurve(table=table)
+
+
+def test_curve_set_direction_and_fan_count():
+    curves = FanCurveSet.from_config({"forward": {"slope": 10, "intercept": 0},
+                                      "reverse": {"slope": 20, "intercept": 0},
+                                      "reverse_threshold": 50})
+    np.testing.assert_allclose(curves.flow([40, 60], 2), [800, 2400])
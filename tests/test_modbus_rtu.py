@@ -0,0 +1,37 @@
+import struct
+import modbus_rtu
+
+
+def test_read_request_frame():
+    # slave 1, register 1, 1개 → CRC d5ca (하위 바이트 먼저)
+    assert modbus_rtu.read_request(1, 1).hex() == "010300010001d5ca"
+
+
+def test_crc16_check_value():
+    # CRC-16/MODBUS 표준 검사값
+    assert modbus_rtu.crc16(b"123456789") == 0x4B37
+
+
+def _response(values, slave=1):
+    body = struct.pack(">BBB%dh" % len(values), slave, modbus_rtu.READ_HOLDING_REGISTERS,
+                       2 * len(values), *values)
+    return body + struct.pack("<H", modbus_rtu.crc16(body))
+
+
+def test_parse_read_response():
+    assert modbus_rtu.parse_read_response(_response([-1234])) == (-1234,)
+    assert modbus_rtu.parse_read_response(_response([12, 34]), count=2) == (12, 34)
+
+
+def test_parse_read_response_rejects_bad_frames():
+    frame = _response([500])
+    assert modbus_rtu.parse_read_response(frame[:-1] + bytes([frame[-1] ^ 1])) is None
+    assert modbus_rtu.parse_read_response(frame, slave=2) is None
+    assert modbus_rtu.parse_read_response(frame[:-1]) is None
+
+
+def test_write_request_frame():
+    frame = modbus_rtu.write_request(1, 2, 500)
+    assert len(frame) == modbus_rtu.WRITE_RESPONSE_SIZE
+    assert frame[:6] == bytes([1, 0x06, 0, 2, 0x01, 0xF4])
+    assert modbus_rtu.crc16(frame[:-2]) == frame[-2] | (frame[-1] << 8)
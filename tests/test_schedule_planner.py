@@ -0,0 +1,55 @@
+import math
+import pytest
+from schedule_planner import StationPlanner
+
+C, N = 200.0, 0.65
+
+
+def flow(duty):
+    # 선형 팬 곡선 (duty 20 → 400, duty 100 → 2000 ㎥/h)
+    return [20.0 * d for d in duty]
+
+
+def house_pressure(duty):
+    return math.pow(20.0 * duty / C, 1 / N)
+
+
+def planner_with(duties):
+    planner = StationPlanner(None, None, 20, 100, flow=flow)
+    for duty in duties:
+        planner.add(duty, house_pressure(duty))
+    return planner
+
+
+def test_model_and_inverse():
+    planner = planner_with([100, 60, 30])
+    C_fit, n_fit = planner.model()
+    assert C_fit == pytest.approx(C)
+    assert n_fit == pytest.approx(N)
+    assert planner.pressure_at(50) == pytest.approx(house_pressure(50))
+    assert planner.duty_for(house_pressure(50)) == 50
+    # duty 범위 밖 압력은 상/하한으로 제한
+    assert planner.duty_for(1.0) == 20
+    assert planner.duty_for(1000.0) == 100
+
+
+def test_targets_log_spaced_within_reach():
+    planner = planner_with([100])
+    targets = planner.targets(5)
+    assert targets[0] == pytest.approx(house_pressure(100))
+    assert targets[-1] == pytest.approx(max(planner.p_min, house_pressure(20)))
+    ratios = [b / a for a, b in zip(targets, targets[1:])]
+    assert ratios == pytest.approx([ratios[0]] * 4)
+    assert planner.missed(targets[1], targets[1] * 1.01) is False
+    assert planner.missed(targets[1], targets[1] * 2) is True
+
+
+def test_plan_skips_repeated_duties():
+    # 좁은 duty 범위: 목표가 많으면 같은 duty가 반복되므로 제외
+    planner = StationPlanner(None, None, 95, 100, flow=flow)
+    planner.add(100, house_pressure(100))
+    plan = planner.plan(10)
+    duties = [planner.duty_for(target) for target in plan]
+    assert len(set(duties)) == len(duties)
+    assert 100 not in duties
+    assert len(plan) <= 5
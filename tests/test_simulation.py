@@ -0,0 +1,20 @@
+import os
+import pytest
+
+# BackgroundTask는 PyQt6가 필요
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import simulate_test
+
+
+def test_simulated_depressurization(tmp_path):
+    run = simulate_test.run_simulation(C=200.0, n=0.65, seed=3, workdir=str(tmp_path))
+    results = run["results"]
+    assert os.path.exists(tmp_path / "depressurization_raw.json")
+    assert results["N"] >= 5
+    # 가상 건물 C=200, n=0.65 (팬 곡선, 공기 보정, 잡음 허용 범위)
+    assert 0.5 < results["n"] < 0.8
+    assert results["ACH50"] == pytest.approx(200.0 * 50 ** 0.65 / 400.0, rel=0.1)
+    # 가상 시계: 실제 시험 시간보다 훨씬 빨리 끝남
+    assert run["wall seconds"] < run["simulated seconds"]
@@ -0,0 +1,93 @@
+import time
+import heapq
+import itertools
+import threading
+
+'''
+측정/제어 모듈 공용 시계
+
+실제 장비: WallClock (기본값, time.monotonic / time.sleep)
+가상 장비: timing.set_clock(timing.VirtualClock()) → sleep은 실제로 기다리지 않고 기상 시각 순서로 시간만 진행
+
+sensor_and_controller, pwm_pid_control, devices, acquisition, BackgroundTask는
+time.sleep / time.time 대신 timing.sleep / timing.monotonic을 사용한다.
+'''
+
+
+class WallClock:
+    """Real time."""
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """Simulated time: sleep() returns without real waiting, waking sleepers in wake-up order.
+
+    Each sleep is scheduled at now + seconds; the earliest pending sleeper moves the
+    clock to max(now, its wake time), so concurrent sleeps overlap instead of adding up.
+    """
+
+    def __init__(self, start=0.0, epoch=None):
+        self.now = start
+        self.epoch = time.time() if epoch is None else epoch
+        self._lock = threading.Condition()
+        # 대기 중인 (기상 시각, 순번) 힙
+        self._wakeups = []
+        self._count = itertools.count()
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.epoch + self.now
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        with self._lock:
+            entry = (self.now + seconds, next(self._count))
+            heapq.heappush(self._wakeups, entry)
+        # 같은 시각에 잠드는 다른 스레드가 먼저 등록할 수 있도록 양보
+        time.sleep(0)
+        with self._lock:
+            try:
+                # 가장 이른 기상 시각의 스레드만 시계를 진행, 나머지는 그 시각까지 대기
+                while self.now < entry[0] and self._wakeups[0] != entry:
+                    self._lock.wait()
+                self.now = max(self.now, entry[0])
+            finally:
+                self._wakeups.remove(entry)
+                heapq.heapify(self._wakeups)
+                self._lock.notify_all()
+
+
+_clock = WallClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock):
+    global _clock
+    _clock = clock if clock is not None else WallClock()
+
+
+def monotonic():
+    return _clock.monotonic()
+
+
+def now():
+    return _clock.time()
+
+
+def sleep(seconds):
+    _clock.sleep(seconds)
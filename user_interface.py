@@ -2,9 +2,11 @@
 # -*- coding: utf-8 -*-
 import sys
 import json
+import math
 import time
 import shutil
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import (
     QApplication,
     QWidget,
@@ -25,17 +27,25 @@ from PyQt6.QtCore import (
     QPointF,
     Qt,
     QThread,
+    QObject,
     pyqtSignal,
     QCoreApplication,
 )
 from PyQt6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 from PyQt6.QtGui import QFont, QFontDatabase, QPixmap
-import ACH_calculator
-import graph_plotter
-import reporting
-import pwm_pid_control
 import sensor_and_controller
+import io_scheduler
+import timing
+import lazy_import
 import platform
+# 계산, 그래프, 보고서 단계의 무거운 의존성은 처음 사용할 때 로드
+ACH_calculator = lazy_import.LazyModule("ACH_calculator")
+graph_plotter = lazy_import.LazyModule("graph_plotter")
+reporting = lazy_import.LazyModule("reporting")
+pwm_pid_control = lazy_import.LazyModule("pwm_pid_control")
+schedule_planner = lazy_import.LazyModule("schedule_planner")
+rig = lazy_import.LazyModule("rig")
+acquisition = lazy_import.LazyModule("acquisition")
 current_os = platform.system()
 if current_os == "Windows":
     test_mode = True
@@ -186,9 +196,46 @@ class InputInitialValues(QWidget):
         self.close()
 
 
+class PressureFeed(QObject):
+    # (경과 시간(s), 압력(Pa)) - 장치 I/O 스케줄러 스레드에서 GUI 스레드로 queued 전달
+    sample = pyqtSignal(float, float)
+
+    def __init__(self, average_time=0.1):
+        super().__init__()
+        self.average_time = average_time
+        self._poll = None
+
+    def read(self):
+        # 압력 수집 스레드 버퍼의 최근 average_time 평균 (센서 포트를 직접 읽지 않음)
+        return acquisition.pressure_stream(test=test_mode).mean(self.average_time)
+
+    def start(self):
+        # 표시 주기 average_time, 처리가 늦어지면 다음 주기로 건너뜀
+        time_start = time.monotonic()
+
+        def emit(new):
+            # 아직 샘플이 없으면 표시 생략
+            if new is not None:
+                self.sample.emit(time.monotonic() - time_start, new)
+        self._poll = io_scheduler.get_scheduler().periodic("live", self.read, self.average_time, emit)
+
+    def stop(self):
+        if self._poll is not None:
+            self._poll.cancel()
+            self._poll = None
+
+
 class LivePressureData(QMainWindow):
-    def __init__(self, initial_message="실시간 압력 측정"):
+    def __init__(self, initial_message="실시간 압력 측정", frame_rate=10, window_seconds=10,
+                 sample_rate=10, max_points=500):
         super(LivePressureData, self).__init__()
+        self.window_seconds = window_seconds
+
+        # 표시 데이터: 원시 샘플을 bucket 단위 평균으로 줄여 최대 max_points 개만 유지
+        # (샘플 추가 O(1), 다시 그리기 O(max_points))
+        self.bucket_size = max(1, math.ceil(window_seconds * sample_rate / max_points))
+        self.buffer = acquisition.RingBuffer(max_points)
+        self.bucket = []
 
         # 초기 시리즈와 차트 설정
         self.series = QLineSeries()
@@ -201,7 +248,7 @@ class LivePressureData(QMainWindow):
         self.axis_y = QValueAxis()
         
         # 축 범위 설정
-        self.axis_x.setRange(0, 100)
+        self.axis_x.setRange(0, window_seconds)
         self.axis_y.setRange(0, 100)
 
         # 축 레이블 설정
@@ -231,30 +278,47 @@ class LivePressureData(QMainWindow):
         layout.addWidget(self.chart_view)
         self.setCentralWidget(main_widget)
 
-        # 초기 데이터 (x는 시간, y는 랜덤값)
-        self.data = [QPointF(i, sensor_and_controller.pressure_read(test=test_mode)) for i in range(10)]
-        self.series.replace(self.data)
+        self.dirty = False
 
-        # 타이머 설정 (1초마다 update_chart 호출)
+        # 센서 읽기는 별도 스레드에서 수행
+        self.feed = PressureFeed()
+        self.feed.sample.connect(self.add_sample)
+        self.feed.start()
+
+        # 타이머 설정 (센서 지연과 무관하게 고정 frame rate로 update_chart 호출)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_chart)
-        self.timer.start(100)
+        self.timer.start(int(1000 / frame_rate))
 
         # 측정 종료 버튼 클릭 이벤트 연결
         self.stop_button.clicked.connect(self.timer.stop)
         self.stop_button.clicked.connect(self.close)
 
-    def update_chart(self):
-        # 새로운 측정값을 데이터에 추가
-        new = sensor_and_controller.pressure_read(test=test_mode)
-        self.data.append(QPointF(self.data[-1].x() + 1, new))
-        # 데이터가 100개를 초과하면 가장 오래된 데이터를 제거
-        if len(self.data) > 100:
-            self.data.pop(0)
-            self.axis_x.setRange(self.data[0].x(), self.data[-1].x())
+    def add_sample(self, elapsed, pressure):
+        # 새로운 측정값을 bucket에 추가 (다시 그리기는 update_chart에서)
+        self.bucket.append(pressure)
+        if len(self.bucket) >= self.bucket_size:
+            self.buffer.append(elapsed, sum(self.bucket) / len(self.bucket))
+            self.bucket = []
+            self.dirty = True
 
+    def update_chart(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        times, values = self.buffer.window(self.window_seconds)
         # 시리즈와 축을 업데이트
-        self.series.replace(self.data)
+        self.series.replace([QPointF(x, y) for x, y in zip(times.tolist(), values.tolist())])
+        self.axis_x.setRange(max(0, times[-1] - self.window_seconds), max(self.window_seconds, times[-1]))
+        # y 축 자동 범위 (10 Pa 단위)
+        low = math.floor(values.min() / 10) * 10
+        high = math.ceil(values.max() / 10) * 10
+        self.axis_y.setRange(low, max(high, low + 10))
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.feed.stop()
+        super().closeEvent(event)
 
 
 class SimpleMessageAutoDisappear(QMainWindow):
@@ -361,21 +425,48 @@ class ResultTableWindow(QWidget):
 
 class BackgroundTask(QThread):
     finished = pyqtSignal()  # 작업 완료 시그널
+    progress = pyqtSignal(str)  # 측정점별 실시간 회귀 결과
+    # 측정점 평균 방식: True면 표준 오차 기준 적응형, False면 고정 10초
+    adaptive_measurement = True
+    # 70Pa duty 탐색 제어 방식: "fast" (모델 기반 추정) 또는 "pid" (기존 PID)
+    control_mode = "fast"
+    # 측정점 배치: "log" (ln ΔP 등간격 목표 압력, 모델로 duty 예측) 또는 "linear" (duty 등간격)
+    station_schedule = "log"
+    # 측정 압력이 목표 간격 이상 벗어난 경우 재측정 횟수
+    station_retries = 1
+    # 조기 종료: ACH50 95% 신뢰 구간의 상대 폭이 이 값 이하이면 남은 측정점 생략 (None이면 사용 안 함)
+    stop_interval = None
+    # 조기 종료 전 최소 측정점 수
+    min_stations = 5
 
     def __init__(self, task_type):
         super().__init__()
         self.task_type = task_type
         self.result = 0 # Initialize the result attribute
+        # 측정점별 (시작, 종료) 시간
+        self.station_windows = []
+        # 다중 팬 장비 (rig.Rig), 단일 팬 시험은 None
+        self.test_rig = None
+        # 측정점별 실시간 회귀 (ACH_calculator.OnlineFit)와 최근 결과
+        self.live_fit = None
+        self.live_result = None
 
     def run(self):
-        if self.task_type == "depressurization":
-            self.blower_door_test(self.task_type)
-        elif self.task_type == "pressurization":
-            self.blower_door_test(self.task_type)
+        if self.task_type in ("depressurization", "pressurization"):
+            try:
+                self.blower_door_test(self.task_type)
+            finally:
+                # 예외 발생 시에도 팬 정지
+                sensor_and_controller.duty_set(0, test=test_mode)
+                if self.test_rig is not None:
+                    self.test_rig.close()
         elif self.task_type == "calculation":
-            self.calculation()
+            # 파이프라인에서 이미 시작된 경우 완료만 대기
+            if not pipeline.wait("calculation"):
+                self.calculation()
         elif self.task_type == "graph_plotting":
-            self.graph_plotting()
+            if not pipeline.wait("graph_plotting"):
+                self.graph_plotting()
         elif self.task_type == "reporting":
             self.reporting()
 
@@ -383,20 +474,69 @@ class BackgroundTask(QThread):
 
     @staticmethod
     def measuring_pressure(total_duration, local_duration):
-        # 압력 측정
+        # 압력 측정 (수집 스레드 버퍼의 구간 평균)
+        stream = acquisition.pressure_stream(test=test_mode)
         pressure = []
         # 측정 시간
         pressure_size = total_duration
         while pressure_size:
             measuring_duration = local_duration
-            pressure.append(sensor_and_controller.
-                            pressure_read(average_time=
-                                          measuring_duration,
-                                          test=test_mode))
+            pressure.append(stream.average(measuring_duration))
             pressure_size -= measuring_duration
         # 측정 평균값 저장
         return sum(pressure)/len(pressure)
 
+    @staticmethod
+    def measuring_pressure_adaptive(local_duration=1, relative_error=0.005, absolute_error=0.2,
+                                    min_duration=3, max_duration=30):
+        # 평균의 표준 오차가 목표(평균의 0.5% 또는 0.2 Pa) 이하가 되거나
+        # 최대 시간에 도달할 때까지 local_duration 평균값을 추가 측정
+        stream = acquisition.pressure_stream(test=test_mode)
+        pressure = []
+        while True:
+            pressure.append(stream.average(local_duration))
+            count = len(pressure)
+            mean = sum(pressure) / count
+            if count * local_duration < min_duration:
+                continue
+            variance = sum((p - mean)**2 for p in pressure) / (count - 1)
+            standard_error = math.sqrt(variance / count)
+            if standard_error <= max(absolute_error, relative_error * abs(mean)) \
+                    or count * local_duration >= max_duration:
+                return mean, standard_error
+
+    def measuring_station(self):
+        # [압력, 표준 오차] (고정 방식은 표준 오차 없음)
+        # 측정 구간은 온습도/대기압 구간 평균용으로 기록
+        station_start = timing.monotonic()
+        if self.adaptive_measurement:
+            result = self.measuring_pressure_adaptive()
+        else:
+            result = self.measuring_pressure(10, 1), None
+        self.station_windows.append((station_start, timing.monotonic()))
+        return result
+
+    @staticmethod
+    def environment_stream():
+        # 온습도/대기압 백그라운드 수집 (/dev/ttyUSB1), 테스트 모드에서는 사용하지 않음
+        if test_mode and sensor_and_controller.get_backend() is None:
+            return None
+        return acquisition.environment_stream()
+
+    def environment_values(self, environment, test_start):
+        # 시험 구간 평균 (계산용)과 측정점별 구간 평균, 샘플이 없으면 표준 조건
+        record = {"source": "default", "samples": 0, "errors": 0, "stations": []}
+        values = dict(sensor_and_controller.ENVIRONMENT_DEFAULTS)
+        if environment is not None and environment.samples():
+            average = environment.average(test_start, timing.monotonic())
+            values.update({name: value for name, value in average.items() if value is not None})
+            record["source"] = "sensor"
+            record["stations"] = [environment.average(start, end) for start, end in self.station_windows]
+        if environment is not None:
+            record["samples"] = environment.samples()
+            record["errors"] = environment.errors
+        return values, record
+
     def blower_door_test(self, test):
 
         # 측정 모드에 따른 변수 설정
@@ -406,17 +546,23 @@ class BackgroundTask(QThread):
         with open('conditions.json', 'r') as f:
             conditions = json.load(f)
         cover = conditions.get("fan_cover", "none").lower()
-        fan_coeffs = ACH_calculator.load_fan_coefficients()
-        coeff = fan_coeffs.get(cover, fan_coeffs.get("none", {}))
+        fan_count = int(conditions.get("fan_count", 2))
+        registry = ACH_calculator.fan_coefficient_registry()
+        coeff = registry.get(cover)
 
         duty_range = coeff.get("duty_range", [20, 100])
         min_duty, max_duty = duty_range
         initial_duty = min_duty - 1
 
+        # 온습도/대기압 수집 (측정점과 별도 스레드, 측정 시간에 영향 없음)
+        environment = self.environment_stream()
+        test_start = timing.monotonic()
+        self.station_windows = []
+
         # 측정
         measuring = {}
         measuring["measured_value"] = []
-        # 온습도, 대기압
+        # 온습도, 대기압 (시험 종료 후 구간 평균으로 갱신)
         measuring["temperature"] = 20
         measuring["relative_humidity"] = 50
         measuring["atmospheric_pressure"] = 101325
@@ -428,6 +574,41 @@ class BackgroundTask(QThread):
         # 시작 0 기류 압력 측정 # 현재 버전에서는 생략
         # measuring["initial_zero_pressure"] = self.measuring_pressure(10, 1)
 
+        # 다중 팬 / 다중 압력 측정점 장비 (rig.json)
+        self.test_rig = rig.load_rig(cover=cover)
+        if self.test_rig is not None:
+            fan_curves = [registry.curve(fan.cover) for fan in self.test_rig.fans]
+        else:
+            fan_curves = registry.curve(cover)
+        self.live_fit = ACH_calculator.OnlineFit(conditions["interior volume"], fan_curves, fan_count)
+        if self.test_rig is not None:
+            self.multi_fan_stations(measuring, self.test_rig, registry)
+        else:
+            self.single_fan_stations(measuring, cover, fan_count, registry, min_duty, max_duty, initial_duty)
+        # 마지막 실시간 회귀 결과 (표준 조건 기준, 최종 계산은 시험 구간 온습도/대기압 사용)
+        measuring["live fit"] = self.live_result
+
+        # 종료 0 기류 압력 측정 # 현재 버전에서는 생략
+        # measuring["final_zero_pressure"] = self.measuring_pressure(10, 1)
+        # 시험 종료
+        sensor_and_controller.duty_set(zero_duty, test=test_mode)
+        # 시험 구간 온습도/대기압 평균 기록
+        values, measuring["environment"] = self.environment_values(environment, test_start)
+        measuring.update(values)
+        print(f"environment ({measuring['environment']['source']}): {values}")
+        # 시험 종료 시간 기록
+        time_end = datetime.now().strftime("%H:%M:%S")
+        measuring["test time"] = [time_start, time_end]
+
+        # Raw data 백업 저장
+        now = datetime.now().strftime("%y%m%d-%H%M%S")
+        with open(f"./measurements/{test}_{now}.json", 'w') as file:
+            json.dump(measuring, file, indent=4)
+        # 데이터 저장
+        with open(f"./{test}_raw.json", 'w') as file:
+            json.dump(measuring, file, indent=4)
+
+    def single_fan_stations(self, measuring, cover, fan_count, registry, min_duty, max_duty, initial_duty):
         # 시험 시작
         success = False
         # 70Pa PWM duty 값 추출
@@ -437,51 +618,192 @@ class BackgroundTask(QThread):
                                                              control_limit=10,
                                                              duty_min=min_duty,
                                                              duty_max=max_duty,
-                                                             test=test_mode)
+                                                             test=test_mode,
+                                                             mode=self.control_mode)
         print(f"max duty: {duty}, control: {success}, pressure at duty: {pressure}")
+        # 제어 결과 (목표 도달 시간, overshoot) 기록
+        measuring["control"] = pwm_pid_control.last_summary
 
         # 70Pa PWM duty 값 추출 실패 시 = 누기량/침기량 대비 압력형성을 위한 풍량 부족
         # max duty부터 min duty 전 까지 10번 수행
         if not success:
             duty = max_duty
             success = True
+            # 마지막 제어 duty가 아니라 max duty에서 측정하도록 적용 후 안정화 대기
+            sensor_and_controller.duty_set(duty, test=test_mode)
+            acquisition.wait_for_settle(acquisition.pressure_stream(test=test_mode), timeout=60)
 
         # duty 최대값 설정 완료 후 측정 수행
         if success:
-            # 60Pa 측정 값 저장
-            measuring["measured_value"].append([pressure, duty])
+            # 60Pa 측정 값 저장 (제어 후 압력 재측정)
+            pressure, uncertainty = self.measuring_station()
+            self.add_station(measuring, [pressure, duty, uncertainty])
             # 측정 범위 설정
             num_to_measure = 10
-            step = (duty - initial_duty) / (num_to_measure - 1)  # 간격 계산
-            duty_range = [round(duty - i * step) for i in range(num_to_measure)]
+            planner = None
+            if self.station_schedule == "log":
+                # 팬 보정 곡선 + 측정점으로 갱신되는 건물 모델로 목표 압력별 duty 예측
+                planner = schedule_planner.StationPlanner(registry.curve(cover), fan_count,
+                                                          initial_duty, duty)
+                planner.add(duty, pressure)
+                # 첫 목표는 위에서 측정한 최고 압력, duty가 겹치는 목표 제외
+                plan = planner.plan(num_to_measure)
+                print(f"target pressures: {[round(t, 1) for t in plan]}")
+                if len(plan) + 1 < self.min_stations:
+                    lowest, highest = planner.reachable()
+                    warning = (f"fan duty {initial_duty}~{duty} only reaches {lowest:.1f}~{highest:.1f} Pa, "
+                               f"{len(plan) + 1} stations instead of {self.min_stations}: "
+                               f"check the fan cover or the building envelope")
+                    print(f"warning: {warning}")
+                    measuring["schedule warning"] = warning
+            else:
+                step = (duty - initial_duty) / (num_to_measure - 1)  # 간격 계산
+                plan = [round(duty - i * step) for i in range(num_to_measure)]
             # 데이터 측정
+            measuring["steps"] = []
             before = duty
-            for d in duty_range:
-                sensor_and_controller.duty_set(d, test=test_mode)
-                print(f"wait for settle: {abs(before - d)} sec")
-                time.sleep(abs(before - d))
-                p = self.measuring_pressure(10, 1)
-                print(f"measuring now duty={d}, pressure={p}")
-                measuring["measured_value"].append([p, d])
-                before = d
-
-        # 종료 0 기류 압력 측정 # 현재 버전에서는 생략
-        # measuring["final_zero_pressure"] = self.measuring_pressure(10, 1)
-        # 시험 종료
-        sensor_and_controller.duty_set(zero_duty, test=test_mode)
-        # 시험 종료 시간 기록
-        time_end = datetime.now().strftime("%H:%M:%S")
-        measuring["test time"] = [time_start, time_end]
+            for planned in plan:
+                retries = 0
+                while True:
+                    d = planner.duty_for(planned) if planner else planned
+                    if planner and d == before:
+                        # 직전과 같은 duty이면 새 정보가 없으므로 생략
+                        print(f"skip target {planned:.1f} Pa, same duty {d}")
+                        break
+                    step_start = timing.monotonic()
+                    sensor_and_controller.duty_set(d, test=test_mode)
+                    # 압력 안정화 감지 (기울기, 변동 기준), duty 변화량에 비례한 최대 대기 시간
+                    settle_timeout = min(60, max(10, 3 * abs(before - d)))
+                    settled, settle_time = acquisition.wait_for_settle(
+                        acquisition.pressure_stream(test=test_mode), timeout=settle_timeout)
+                    print(f"settled: {settled} after {settle_time:.1f} sec")
+                    p, u = self.measuring_station()
+                    print(f"measuring now duty={d}, pressure={p}, standard error={u}")
+                    self.add_station(measuring, [p, d, u])
+                    # 단계별 소요 시간 기록
+                    measuring["steps"].append({"duty": d,
+                                               "target pressure": planned if planner else None,
+                                               "retry": retries,
+                                               "settled": settled,
+                                               "settle time": settle_time,
+                                               "step time": timing.monotonic() - step_start})
+                    before = d
+                    if planner is None:
+                        break
+                    # 측정점 추가 후 모델 갱신, 목표에서 크게 벗어나면 갱신된 모델로 재측정
+                    planner.add(d, p)
+                    if retries >= self.station_retries or not planner.missed(planned, p):
+                        break
+                    retries += 1
+                if self.converged():
+                    break
+
+    def add_station(self, measuring, row):
+        # 측정점 저장 후 실시간 회귀 갱신 (측정점당 O(1))
+        measuring["measured_value"].append(row)
+        self.live_fit.add(row)
+        fit = self.live_fit.results()
+        if fit is None:
+            return
+        self.live_result = fit
+        text = f"N={fit['N']}, n={fit['n']:.3f}, C0={fit['C0']:.1f}, ACH50={fit['ACH50']:.2f}"
+        if "ACH50 range" in fit:
+            text += f" (95%: {fit['ACH50 range'][0]:.2f} ~ {fit['ACH50 range'][1]:.2f})"
+        print(f"live fit: {text}")
+        self.progress.emit(f"측정 중...\n{text}")
+
+    def converged(self):
+        # 최소 측정점 이상, ACH50 신뢰 구간이 stop_interval 이내이면 남은 측정점 생략
+        fit = self.live_result
+        if self.stop_interval is None or fit is None or fit["N"] < self.min_stations:
+            return False
+        if fit.get("ACH50 margin", math.inf) > self.stop_interval:
+            return False
+        print(f"ACH50 interval ±{fit['ACH50 margin'] * 100:.1f}% after {fit['N']} stations, stop measuring")
+        return True
+
+    def measuring_rig_station(self, test_rig, count=10, period=1.0, samples=10):
+        # 측정점별 평균 압력과 구역 평균 압력의 표준 오차
+        station_start = timing.monotonic()
+        readings = []
+        for _ in range(count):
+            reading = test_rig.read_taps(samples)
+            if None not in reading:
+                readings.append(reading)
+            timing.sleep(period)
+        self.station_windows.append((station_start, timing.monotonic()))
+        if not readings:
+            raise IOError("pressure taps did not respond")
+        taps = [sum(tap) / len(tap) for tap in zip(*readings)]
+        means = [sum(reading) / len(reading) for reading in readings]
+        if len(means) < 2:
+            return taps, None
+        mean = sum(means) / len(means)
+        variance = sum((m - mean)**2 for m in means) / (len(means) - 1)
+        return taps, math.sqrt(variance / len(means))
+
+    def multi_fan_stations(self, measuring, test_rig, registry, num_to_measure=10, p_min=10.0):
+        # 팬별 duty 범위 (커버별 보정 값)
+        duty_ranges = [registry.get(fan.cover).get("duty_range", [20, 100]) for fan in test_rig.fans]
+        measuring.update(test_rig.describe())
+        measuring["steps"] = []
+        # 70Pa 구역별 동시 제어
+        curves = [registry.curve(fan.cover) for fan in test_rig.fans]
+        duties, success, pressures, control = pwm_pid_control.get_duties(test_rig, 70, duty_ranges, curves)
+        print(f"max duties: {duties}, control: {success}, pressures: {pressures}")
+        measuring["control"] = pwm_pid_control.last_summary
+        taps, uncertainty = self.measuring_rig_station(test_rig)
+        self.add_station(measuring, [taps, duties, uncertainty])
+
+        # 최저 목표 압력: 1점 모델 (n = 0.65)로 팬 최소 duty 유량의 압력 예측
+        high = sum(taps) / len(taps)
+        flow_high = sum(float(curve.flow(duty)) for curve, duty in zip(curves, duties))
+        flow_low = sum(float(curve.flow(pwm_pid_control.duty_transformation(0, *duty_range)))
+                       for curve, duty_range in zip(curves, duty_ranges))
+        lowest = high * math.pow(flow_low / flow_high, 1 / 0.65) if flow_high > 0 else p_min
+        low = min(max(p_min, 1.05 * lowest), high)
+        if low > 0.9 * high:
+            print(f"warning: fan minimum flow keeps {lowest:.1f} Pa, too few fans open or building too tight")
+        plan = schedule_planner.log_spaced_pressures(high, low, num_to_measure)[1:]
+        print(f"target pressures: {[round(t, 1) for t in plan]}")
+
+        for target in plan:
+            step_start = timing.monotonic()
+            # 직전 제어 duty에서 시작
+            duties, success, pressures, control = pwm_pid_control.get_duties(
+                test_rig, target, duty_ranges, curves, initial_duty=control)
+            taps, uncertainty = self.measuring_rig_station(test_rig)
+            print(f"measuring now duties={duties}, pressures={taps}, standard error={uncertainty}")
+            self.add_station(measuring, [taps, duties, uncertainty])
+            measuring["steps"].append({"duty": duties,
+                                       "target pressure": target,
+                                       "controlled": success,
+                                       "step time": timing.monotonic() - step_start})
+            if self.converged():
+                break
+        # 시험 종료, 모든 팬 정지
+        test_rig.set_duties([0] * len(test_rig.fans))
 
-        # Raw data 백업 저장
+    @staticmethod
+    def calculate_test(test):
+        # 파일 불러오기
+        calculator = ACH_calculator.BlowerDoorTestCalculator.from_file(f'{test}_raw.json', 'conditions.json')
+        # 결과 계산
+        results = calculator.calculate_results()
+        # Raw data 저장
         now = datetime.now().strftime("%y%m%d-%H%M%S")
-        with open(f"./measurements/{test}_{now}.json", 'w') as file:
-            json.dump(measuring, file, indent=4)
-        # 데이터 저장
-        with open(f"./{test}_raw.json", 'w') as file:
-            json.dump(measuring, file, indent=4)
+        with open(f"./calculations/{test}_{now}.json", 'w') as file:
+            json.dump(results, file, indent=4)
+        return results
 
-    def calculation(self):
+    @staticmethod
+    def test_results(test):
+        results = pipeline.test_results(test)
+        return results if results is not None else BackgroundTask.calculate_test(test)
+
+    # 통합 계산/최종 그래프는 QThread 상태를 쓰지 않으므로 파이프라인 스레드에서 직접 실행
+    @staticmethod
+    def calculation():
         # 시험 조건 불러오기
         conditions = 'conditions.json'
         with open(conditions, 'r') as file:
@@ -531,15 +853,8 @@ class BackgroundTask(QThread):
             
         # 감압 시험을 수행 한 경우
         if data.get("depressurization"):
-            # 파일 불러오기
-            depressureization = ACH_calculator.BlowerDoorTestCalculator.from_file('depressurization_raw.json',
-                                                                                'conditions.json')
-            # 결과 계산
-            results_depr = depressureization.calculate_results()
-            # Raw data 저장
-            now = datetime.now().strftime("%y%m%d-%H%M%S")
-            with open(f"./calculations/depressurization_{now}.json", 'w') as file:
-                json.dump(results_depr, file, indent=4)
+            # 결과 계산 (파이프라인에서 미리 계산된 경우 재사용)
+            results_depr = BackgroundTask.test_results("depressurization")
             # 결과 값 변수 저장
             calculation_raw['depressurization'] = {}
             for i in results_depr.keys():
@@ -552,15 +867,8 @@ class BackgroundTask(QThread):
 
         # 가압 시험을 수행 한 경우
         if data.get("pressurization"):
-            # 파일 불러오기
-            pressureization = ACH_calculator.BlowerDoorTestCalculator.from_file('pressurization_raw.json',
-                                                                                'conditions.json')
-            # 결과 계산
-            results_pres = pressureization.calculate_results()
-            # Raw data 저장
-            now = datetime.now().strftime("%y%m%d-%H%M%S")
-            with open(f"./calculations/pressurization_{now}.json", 'w') as file:
-                json.dump(results_pres, file, indent=4)
+            # 결과 계산 (파이프라인에서 미리 계산된 경우 재사용)
+            results_pres = BackgroundTask.test_results("pressurization")
             # 결과 값 변수 저장
             calculation_raw['pressurization'] = {}
             for i in results_pres.keys():
@@ -581,9 +889,10 @@ class BackgroundTask(QThread):
         with open(f"./calculation_raw.json", 'w') as file:
             json.dump(calculation_raw, file, indent=4)
 
-        print(f"{self.task_type} is done.")
+        print("calculation is done.")
 
-    def graph_plotting(self):
+    @staticmethod
+    def graph_plotting():
         # 시험 조건 불러오기
         conditions = 'conditions.json'
         with open(conditions, 'r') as file:
@@ -633,7 +942,78 @@ class BackgroundTask(QThread):
             sub.call(f"xpdf ./report.pdf", shell=True)
 
 
+class ResultPipeline:
+    """Background calculation and graphing that overlaps with the remaining tests.
+
+    As soon as a test's raw data is saved, its calculation and a preview graph
+    (graph_<test>.png) run on a single worker thread (matplotlib is not thread
+    safe). After the last test, the merged calculation and final graph are
+    queued as well; the calculation/graph stages then only wait for them.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline")
+        self.results = {}
+        self.stages = {}
+
+    def test_saved(self, test):
+        self.results[test] = self.executor.submit(self._test_done, test)
+
+    def _test_done(self, test):
+        results = BackgroundTask.calculate_test(test)
+        # 미리보기 그래프 (그래프 함수가 결과 dict를 수정하므로 사본 사용)
+        sign = "-" if test == "depressurization" else "+"
+        report = {i + sign: results[i] for i in ["ACH50", "interior_volume"]}
+        preview = dict(results)
+        try:
+            graph_plotter.plot_graph(preview if sign == "-" else False,
+                                     preview if sign == "+" else False,
+                                     report, output=f"./graph_{test}.png", backup=False)
+        except Exception as e:
+            # 미리보기 실패는 계산 결과에 영향 없음
+            print(f"{test} preview graph failed: {e}")
+        print(f"{test} calculation is done.")
+        return results
+
+    def test_results(self, test):
+        # 미리 계산된 결과, 없거나 실패한 경우 None
+        future = self.results.get(test)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"background {test} calculation failed: {e}")
+            return None
+
+    def finish(self):
+        # 마지막 시험 후 통합 계산, 최종 그래프 연속 실행
+        self.stages["calculation"] = self.executor.submit(BackgroundTask.calculation)
+        self.stages["graph_plotting"] = self.executor.submit(BackgroundTask.graph_plotting)
+
+    def wait(self, stage):
+        # 파이프라인에서 실행한 단계면 완료 대기 후 True, 실패 시 False (다시 실행)
+        future = self.stages.get(stage)
+        if future is None:
+            return False
+        try:
+            future.result()
+            return True
+        except Exception as e:
+            print(f"background {stage} failed: {e}")
+            return False
+
+
+pipeline = ResultPipeline()
+
+
 if __name__ == '__main__':
+    # 모듈별 import 시간 측정 모드
+    if "--import-times" in sys.argv:
+        lazy_import.report_import_times(acquisition, schedule_planner, rig, pwm_pid_control,
+                                        ACH_calculator, graph_plotter, reporting)
+        sys.exit(0)
+
     # Ensure the fan PWM duty is zero on startup so that the fan does not run
     # even if powered. This provides a safe default state before any test begins.
     sensor_and_controller.duty_set(0, test=test_mode)
@@ -655,18 +1035,29 @@ if __name__ == '__main__':
 
     # 메세지 종료 시간
     time_to_close = 2
+    # 시험 준비 실시간 압력 표시 구간 (s), 사전 누기 확인용
+    live_window = 600
 
     # 시험 조건 입력
     initialize = InputInitialValues()
     initialize.setWindowTitle("시험 조건 입력")
     initialize.resize(size_w, size_h)
     initialize.show()
+    # 조건 입력 중 백그라운드에서 측정/계산/그래프/보고서 모듈 미리 로드
+    lazy_import.prewarm(acquisition, pwm_pid_control, ACH_calculator, graph_plotter, reporting)
     app.exec()
 
     # 시험 조건 불러오기
     with open('conditions.json', 'r') as file:
         data = json.load(file)
 
+    # 가상 시험 장비 모드 (센서, GPIO 없이 전체 흐름 실행)
+    if "--simulate" in sys.argv:
+        import devices
+        sensor_and_controller.set_backend(
+            devices.SimulatedBackend(cover=data.get("fan_cover", "none").lower(),
+                                     fan_count=int(data.get("fan_count", 2))))
+
     # 측정 시작 시간 저장
     time_start = datetime.now().strftime("%y/%m/%d %H:%M:%S")
 
@@ -674,7 +1065,7 @@ if __name__ == '__main__':
     if data.get("depressurization"):
         # 감압 시험 준비
         long_message = "측정 시작 버튼을 눌리세요."
-        pressure = LivePressureData(long_message)
+        pressure = LivePressureData(long_message, window_seconds=live_window)
         pressure.setWindowTitle("감압 시험 준비")
         pressure.resize(size_w, size_h)
         pressure.show()
@@ -688,8 +1079,11 @@ if __name__ == '__main__':
         message.show()
         wait_for_end = BackgroundTask("depressurization")
         wait_for_end.finished.connect(message.close)
+        wait_for_end.progress.connect(message.label.setText)
         wait_for_end.start()    
         app.exec()
+        # 가압 시험 준비/측정 중 감압 결과 계산, 그래프 작성
+        pipeline.test_saved("depressurization")
         # 측정 종료
         end_of_test = SimpleMessageAutoDisappear("감압 시험 측정 완료.", time_to_close)
         end_of_test.resize(size_w, size_h)
@@ -700,7 +1094,7 @@ if __name__ == '__main__':
     if data.get("pressurization"):
         # 가압 시험 준비
         long_message = "측정 시작 버튼을 눌리세요."
-        pressure = LivePressureData(long_message)
+        pressure = LivePressureData(long_message, window_seconds=live_window)
         pressure.setWindowTitle("가압시험 준비")
         pressure.resize(size_w, size_h)
         pressure.show()
@@ -714,8 +1108,10 @@ if __name__ == '__main__':
         message.show()
         wait_for_end = BackgroundTask("pressurization")
         wait_for_end.finished.connect(message.close)
+        wait_for_end.progress.connect(message.label.setText)
         wait_for_end.start()    
         app.exec()    
+        pipeline.test_saved("pressurization")
         # 측정 종료
         end_of_test = SimpleMessageAutoDisappear("가압 시험 측정 완료.", time_to_close)
         end_of_test.resize(size_w, size_h)
@@ -727,6 +1123,8 @@ if __name__ == '__main__':
     data["test_period"] = f"{time_start}~{time_end}"
     with open("conditions.json", "w") as file:
         json.dump(data, file, indent=4)
+    # 통합 계산, 최종 그래프 백그라운드 시작 (아래 단계는 완료 대기)
+    pipeline.finish()
 
     ###################
     ## 결과 계산 코드 실행